@@ -2,18 +2,22 @@
 Typer CLI Application
 """
 
-import os
+from pathlib import Path
+from typing import Optional
 
 import typer
 from typing_extensions import Annotated
 
-from connman_cli.commands import auth, config, ping, profile
+from connman_cli.commands import auth, bench, cache, config, ping, profile
+from connman_cli.lib import api_client, log
 from connman_cli.lib.config import check_config
+from connman_cli.lib.constants import LogFormat, LogLevel, ProfileFormat
 
 app = typer.Typer()
 
 # Add Commands
 app.command(name="ping")(ping.command)
+app.command(name="bench")(bench.command)
 
 # Add Subcommands
 app.add_typer(auth.app, name="auth", help="Authentication Subcommands")
@@ -21,15 +25,80 @@ app.add_typer(
     config.app, name="config", help="Manage CIS2 Connection Manager Configurations"
 )
 app.add_typer(profile.app, name="profile", help="View, set and update profiles")
+app.add_typer(cache.app, name="cache", help="Inspect and prune the local cache")
 
 
 @app.callback()
 def main(
-    _: typer.Context,
-    quiet: Annotated[bool, typer.Option(..., help="Silence log output")] = False,
-    colour: Annotated[bool, typer.Option(..., help="Use colours in output")] = True,
+    ctx: typer.Context,
+    quiet: Annotated[
+        bool, typer.Option(..., envvar="CONNMAN_SILENT", help="Silence log output")
+    ] = False,
+    colour: Annotated[
+        bool, typer.Option(..., envvar="CONNMAN_COLOUR", help="Use colours in output")
+    ] = True,
+    log_level: Annotated[
+        LogLevel,
+        typer.Option(
+            envvar="CONNMAN_LOG_LEVEL", help="Hide log messages below this level"
+        ),
+    ] = LogLevel.debug,
+    log_format: Annotated[
+        LogFormat,
+        typer.Option(
+            envvar="CONNMAN_LOG_FORMAT",
+            help="Write log messages as text, or JSON lines on stderr",
+        ),
+    ] = LogFormat.text,
+    record: Annotated[
+        Optional[Path],
+        typer.Option(help="Record API requests and responses to a cassette file"),
+    ] = None,
+    replay: Annotated[
+        Optional[Path],
+        typer.Option(
+            help="Replay API responses from a cassette file without network access"
+        ),
+    ] = None,
+    http2: Annotated[
+        bool,
+        typer.Option(
+            help="Multiplex requests over HTTP/2, needs the http2 extra. "
+            "Ignored with --record and --replay"
+        ),
+    ] = False,
+    profile_run: Annotated[
+        Optional[Path],
+        typer.Option(help="Profile the command and write the profile to a file"),
+    ] = None,
+    profile_format: Annotated[
+        ProfileFormat, typer.Option(help="Format of the --profile-run file")
+    ] = ProfileFormat.pstats,
+    profile_memory: Annotated[
+        bool, typer.Option(help="Trace memory allocations with --profile-run")
+    ] = False,
 ):
     """Set Main Command Arguments"""
-    os.environ.setdefault("CONNMAN_SILENT", str(quiet))
-    os.environ.setdefault("CONNMAN_COLOUR", str(colour))
+    # pylint: disable=too-many-arguments
+    if ctx.resilient_parsing:
+        # Shell completion, skip config checks and prompts
+        return
+
+    if record and replay:
+        raise typer.BadParameter("--record and --replay cannot be used together.")
+
+    # Flags take precedence over their environment variables
+    log.configure(level=log_level, log_format=log_format, colour=colour, silent=quiet)
+    api_client.configure_transport(record=record, replay=replay, http2=http2)
+
+    if profile_run:
+        # pylint: disable=import-outside-toplevel
+        from connman_cli.lib.profiling import CommandProfiler
+
+        profiler = CommandProfiler(profile_run, profile_format, profile_memory)
+        # Close callbacks run in reverse, so this stops after clients are closed
+        ctx.call_on_close(profiler.stop)
+        profiler.start()
+
+    ctx.call_on_close(api_client.close_clients)
     check_config()
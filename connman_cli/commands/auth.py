@@ -12,12 +12,9 @@ import typer
 from typing_extensions import Annotated
 
 from connman_cli.lib import log, api_client
+from connman_cli.lib.completion import complete_profile
 from connman_cli.lib.constants import CIS2Environments
-from connman_cli.lib.token import (
-    cache_token,
-    get_cached_token,
-    decode_token_from_headers,
-)
+from connman_cli.lib.token import cache_token, get_cached_token
 from connman_cli.lib.config import get_config, write_config
 
 app = typer.Typer()
@@ -42,9 +39,15 @@ def print_token_info(token_info: dict):
 
 @app.command()
 def login(
-    profile: Annotated[Optional[str], typer.Option()] = None,
+    profile: Annotated[
+        Optional[str], typer.Option(autocompletion=complete_profile)
+    ] = None,
     env: Annotated[Optional[CIS2Environments], typer.Option()] = None,
     secret: Annotated[Optional[str], typer.Option()] = None,
+    verify: Annotated[
+        bool,
+        typer.Option(help="Verify the token signature against the issuer's keys"),
+    ] = False,
 ):
     """
     Login to a CIS2 Connection Manager Environment
@@ -79,16 +82,23 @@ def login(
         env = CIS2Environments(profile_config["environment"])
         secret = profile_config["secret"]
 
-        response = api_client.auth(env, secret)
+        result = api_client.auth(env, secret, verify)
 
-        raw_token, token_info = decode_token_from_headers(response.headers)
-        print_token_info(token_info)
-        cache_token(raw_token, token_info, env)
+        print_token_info(result.info)
 
-        config = get_config()
-        config["connman.profile"] = {"selected": profile_key, "authtime": int(time())}
-        write_config(config)
-        log.success(f"Selected Profile: [bold]{profile}[/bold]")
+        # A replayed token is redacted, it must not replace a real one
+        if api_client.is_replaying():
+            log.info("Replayed token is not cached and the profile is not selected")
+        else:
+            cache_token(result.token, result.info, env)
+
+            config = get_config()
+            config["connman.profile"] = {
+                "selected": profile_key,
+                "authtime": int(time()),
+            }
+            write_config(config)
+            log.success(f"Selected Profile: [bold]{profile}[/bold]")
 
     else:
         log.info("Performing Secret Authentication")
@@ -97,11 +107,14 @@ def login(
             log.error("Both --env and --secret are required.")
             raise typer.Exit(1)
 
-        response = api_client.auth(env, secret)
+        result = api_client.auth(env, secret, verify)
+
+        print_token_info(result.info)
 
-        raw_token, token_info = decode_token_from_headers(response.headers)
-        print_token_info(token_info)
-        cache_token(raw_token, token_info, env)
+        if api_client.is_replaying():
+            log.info("Replayed token is not cached")
+        else:
+            cache_token(result.token, result.info, env)
 
     log.success("Authenticated with CIS2 Connection Manager")
 
@@ -0,0 +1,131 @@
+"""
+Bench command
+
+Usage: connman bench --help
+"""
+from itertools import cycle
+from typing import List, Optional
+
+import typer
+from typing_extensions import Annotated
+
+from connman_cli.lib import api_client, log
+from connman_cli.lib.config import get_current_profile
+from connman_cli.lib.constants import BenchWorkload, CIS2Environments
+from connman_cli.lib.token import CachedTokenProvider
+
+
+def command(
+    # pylint:disable=too-many-arguments,too-many-locals
+    workload: Annotated[
+        BenchWorkload, typer.Argument(help="Request to send repeatedly")
+    ] = BenchWorkload.ping,
+    concurrency: Annotated[
+        int, typer.Option(min=1, help="Number of concurrent workers")
+    ] = 1,
+    duration: Annotated[
+        float, typer.Option(min=0.1, help="Duration of the run in seconds")
+    ] = 10.0,
+    config_id: Annotated[
+        Optional[List[str]],
+        typer.Option(help="Config to fetch for the get workload (default: all)"),
+    ] = None,
+    env: Annotated[Optional[CIS2Environments], typer.Option()] = None,
+    team_id: Annotated[Optional[str], typer.Option()] = None,
+    base_url: Annotated[
+        Optional[str],
+        typer.Option(help="Override the API base URL, e.g. a local stub server"),
+    ] = None,
+    json_output: Annotated[
+        bool, typer.Option("--json", help="Print the results as JSON")
+    ] = False,
+):
+    """
+    Measure CIS2 Connection Manager API throughput and latency
+    """
+    # pylint: disable=import-outside-toplevel
+    from connman_cli.lib.bench import run_benchmark
+    from connman_cli.lib.client import ConnmanClient, get_team_token
+
+    profile = get_current_profile()
+    if profile:
+        env = profile["env"]
+        team_id = profile["team_id"]
+
+    if env is None:
+        log.error("Could not determine an environment.")
+        raise typer.Exit(1)
+
+    # Clients share the transport set by --record, --replay or --http2
+    with api_client.handle_errors():
+        transport = api_client.get_transport()
+        token_provider = api_client.get_token_provider(CachedTokenProvider())
+
+    clients: List["ConnmanClient"] = []
+
+    def make_client() -> "ConnmanClient":
+        client = ConnmanClient(
+            env, token_provider=token_provider, base_url=base_url, transport=transport
+        )
+        clients.append(client)
+        return client
+
+    def make_operation():
+        client = make_client()
+
+        if workload == BenchWorkload.list:
+            return lambda: client.list_configs(team_id)
+
+        if workload == BenchWorkload.get:
+            config_id_cycle = cycle(config_ids)
+            return lambda: client.get_config(team_id, next(config_id_cycle))
+
+        return client.ping
+
+    config_ids: List[str] = []
+
+    try:
+        if workload != BenchWorkload.ping:
+            api_client.check_required_arguments(env, team_id)
+
+            with api_client.handle_errors():
+                get_team_token(token_provider, env, team_id)
+
+        if workload == BenchWorkload.get:
+            config_ids = config_id or []
+            if not config_ids:
+                with api_client.handle_errors():
+                    config_ids = make_client().list_configs(team_id)
+
+            if not config_ids:
+                log.error("There are no configs to fetch for this team.")
+                raise typer.Exit(1)
+
+        log.info(
+            f"Running [bold]{workload.value}[/bold] for {duration}s "
+            f"with concurrency={concurrency}"
+        )
+        result = run_benchmark(workload.value, make_operation, concurrency, duration)
+    finally:
+        # Closing a client closes the shared transport, so close them together
+        for client in clients:
+            client.close()
+
+    summary = result.to_dict()
+
+    if json_output:
+        log.print_json(summary, force=True)
+    else:
+        latency = summary["latency_ms"]
+        log.print(f"Requests:\t{summary['requests']}", force=True)
+        log.print(f"Errors:\t\t{summary['errors']}", force=True)
+        log.print(f"Throughput:\t{summary['throughput_rps']} req/s", force=True)
+        log.print(
+            "Latency (ms):\t"
+            + "  ".join(f"{key}={value}" for key, value in latency.items()),
+            force=True,
+        )
+
+    if result.errors:
+        log.warn(f"{result.errors} requests failed")
+        raise typer.Exit(1)
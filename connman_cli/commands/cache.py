@@ -0,0 +1,79 @@
+"""
+Cache commands
+
+Usage: connman cache --help
+"""
+from typing import List, Optional
+
+import typer
+from typing_extensions import Annotated
+
+from connman_cli.lib import log
+from connman_cli.lib.cache import (
+    CacheEntry,
+    CacheLimits,
+    cache_stats,
+    clear_cache,
+    prune_cache,
+)
+
+app = typer.Typer()
+
+
+def _summary(entries: List[CacheEntry]) -> dict:
+    return {
+        "entries": len(entries),
+        "bytes": sum(entry.size for entry in entries),
+        "files": sorted(entry.path.name for entry in entries),
+    }
+
+
+@app.command(name="stats")
+def stats():
+    """
+    Show entry counts, sizes and ages of cached files
+    """
+    log.print_json(cache_stats(), force=True)
+
+
+@app.command(name="prune")
+def prune(
+    max_age_days: Annotated[
+        Optional[float],
+        typer.Option(help="Remove entries older than this. Defaults to the config"),
+    ] = None,
+    max_size_kb: Annotated[
+        Optional[float],
+        typer.Option(help="Remove the oldest entries above this size"),
+    ] = None,
+    dry_run: Annotated[
+        bool, typer.Option(help="List the entries without removing them")
+    ] = False,
+):
+    """
+    Remove expired tokens and entries over the age and size caps
+
+    Caps default to max_age_days and max_size_kb in the [connman.cache]
+    section of the config file
+    """
+    limits = CacheLimits.from_config()
+    if max_age_days is not None:
+        limits.max_age_days = max_age_days
+    if max_size_kb is not None:
+        limits.max_size_kb = max_size_kb
+
+    pruned = prune_cache(limits, dry_run=dry_run)
+    log.print_json(_summary(pruned), force=True)
+
+
+@app.command(name="clear")
+def clear(
+    yes: Annotated[bool, typer.Option("--yes", "-y", help="Skip confirmation")] = False
+):
+    """
+    Remove every cached file, including access tokens
+    """
+    if not yes:
+        typer.confirm("Remove all cached tokens and keys?", abort=True)
+
+    log.print_json(_summary(clear_cache()), force=True)
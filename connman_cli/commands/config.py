@@ -3,12 +3,14 @@ Config Commands
 
 Usage: connman config --help
 """
+import json
 from typing import List, Optional
 
 import typer
 from typing_extensions import Annotated
 
 from connman_cli.lib import api_client, log
+from connman_cli.lib.completion import complete_config_id
 from connman_cli.lib.config import get_current_profile
 from connman_cli.lib.constants import CIS2Environments, JWKSSigningAlgorithm
 
@@ -17,7 +19,7 @@ app = typer.Typer()
 
 @app.command(name="get")
 def get_single_config(
-    config_id: Annotated[str, typer.Argument()],
+    config_id: Annotated[str, typer.Argument(autocompletion=complete_config_id)],
     env: Annotated[Optional[CIS2Environments], typer.Option()] = None,
     team_id: Annotated[Optional[str], typer.Option()] = None,
 ):
@@ -29,8 +31,7 @@ def get_single_config(
         env = profile["env"]
         team_id = profile["team_id"]
 
-    response = api_client.get_config(env, team_id, config_id)
-    config = response.json()
+    config = api_client.get_config(env, team_id, config_id)
     log.print_json(config, force=True)
 
 
@@ -48,10 +49,7 @@ def list_all_configs(
         env = profile["env"]
         team_id = profile["team_id"]
 
-    response = api_client.list_configs(env, team_id)
-
-    data = response.json()
-    config_list = data.get("configs", [])
+    config_list = api_client.list_configs(env, team_id)
 
     if len(config_list) == 0:
         log.warn("You have not set up any configs for this team.")
@@ -67,13 +65,61 @@ def list_all_configs(
         raise typer.Exit(0)
 
     configs = {
-        config_id: api_client.get_config(env, team_id, config_id).json()
+        config_id: api_client.get_config(env, team_id, config_id)
         for config_id in config_list
     }
 
     log.print_json(configs, force=True)
 
 
+@app.command(name="watch")
+def watch_configs(
+    # pylint:disable=too-many-arguments
+    env: Annotated[Optional[CIS2Environments], typer.Option()] = None,
+    team_id: Annotated[Optional[str], typer.Option()] = None,
+    interval: Annotated[
+        float, typer.Option(min=1.0, help="Seconds between polls after a change")
+    ] = 5.0,
+    max_interval: Annotated[
+        float,
+        typer.Option(min=1.0, help="Longest wait between polls while nothing changes"),
+    ] = 60.0,
+    initial: Annotated[
+        bool, typer.Option(help="Emit existing configs as created events")
+    ] = False,
+    max_polls: Annotated[
+        Optional[int], typer.Option(min=1, help="Stop after this many polls")
+    ] = None,
+):
+    """
+    Watch configs for changes, printing created, updated and deleted
+    events as JSON lines
+    """
+    # Keep stdout a clean stream of events, for piping into jq and the like
+    log.use_stderr()
+
+    profile = get_current_profile()
+    if profile:
+        env = profile["env"]
+        team_id = profile["team_id"]
+
+    def emit(event):
+        typer.echo(json.dumps(event.to_dict(), separators=(",", ":")))
+
+    try:
+        api_client.watch_configs(
+            env,
+            team_id,
+            emit,
+            interval,
+            max_interval,
+            initial=initial,
+            max_polls=max_polls,
+        )
+    except KeyboardInterrupt as exc:
+        raise typer.Exit(0) from exc
+
+
 @app.command()
 def create(
     # pylint:disable=too-many-arguments
@@ -109,7 +155,7 @@ def create(
         env = profile["env"]
         team_id = profile["team_id"]
 
-    response = api_client.create_config(
+    config = api_client.create_config(
         env,
         team_id,
         client_name,
@@ -119,10 +165,6 @@ def create(
         jwks_uri,
         jwks_uri_signing_algorithm,
     )
-    if not response.ok:
-        raise typer.Exit(1)
-
-    config = response.json()
 
     log.success(f"Created config with name=[bold]{config['config_name']}[/bold]")
     log.print_json(config, force=True)
@@ -132,7 +174,12 @@ def create(
 def edit(
     # pylint:disable=too-many-arguments
     client_name: Annotated[
-        str, typer.Argument(..., help="The name of the client to be modified")
+        str,
+        typer.Argument(
+            ...,
+            help="The name of the client to be modified",
+            autocompletion=complete_config_id,
+        ),
     ],
     redirect_uri: Annotated[
         Optional[List[str]],
@@ -183,8 +230,7 @@ def edit(
         env = profile["env"]
         team_id = profile["team_id"]
 
-    response = api_client.get_config(env, team_id, client_name)
-    data = response.json()
+    data = api_client.get_config(env, team_id, client_name)
 
     client = data["client_config"]
 
@@ -207,9 +253,7 @@ def edit(
 
     log.info(f"Saving modified client with hash=[bold]{data['hash']}[/bold]")
 
-    response = api_client.update_config(
-        env, team_id, client_name, new_client, data["hash"]
-    )
+    api_client.update_config(env, team_id, client_name, new_client, data["hash"])
 
     log.success(f"Updated client [bold]{client_name}[/bold]")
     log.print_json(new_client, force=True)
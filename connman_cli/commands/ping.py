@@ -3,16 +3,82 @@ Ping command
 
 Usage: connman ping --help
 """
+from typing import Dict, Optional
 
 import typer
 from typing_extensions import Annotated
 
-from connman_cli.lib import api_client
+from connman_cli.lib import api_client, log
+from connman_cli.lib.config import get_config
 from connman_cli.lib.constants import CIS2Environments
 
 
+def get_profile_secrets() -> Dict[CIS2Environments, Dict[str, str]]:
+    """Secrets of each saved profile, grouped by environment"""
+    config = get_config()
+    secrets: Dict[CIS2Environments, Dict[str, str]] = {}
+
+    for section in config.sections():
+        if not section.startswith("connman.profile."):
+            continue
+
+        profile = config[section]
+        if "environment" in profile and "secret" in profile:
+            env = CIS2Environments(profile["environment"])
+            name = section.removeprefix("connman.profile.")
+            secrets.setdefault(env, {})[name] = profile["secret"]
+
+    return secrets
+
+
+def health_check(auth: bool):
+    """
+    Probe every environment concurrently and exit with
+
+    0 if every check passed, 1 if any check failed, or 2 if no
+    environment could be reached
+    """
+    secrets = get_profile_secrets() if auth else None
+    results = api_client.health_check(list(CIS2Environments), secrets)
+
+    for result in results:
+        if result.ok:
+            log.success(
+                f"{result.env.value} {result.check} responded in "
+                f"[bold]{result.latency_ms:.0f}ms[/bold]"
+            )
+        else:
+            log.error(f"{result.env.value} {result.check} failed: {result.error}")
+
+    log.print_json([result.to_dict() for result in results], force=True)
+
+    pings = [result for result in results if result.check == "ping"]
+    if not any(result.ok for result in pings):
+        raise typer.Exit(2)
+
+    if not all(result.ok for result in results):
+        raise typer.Exit(1)
+
+
 def command(
-    env: Annotated[CIS2Environments, typer.Option(prompt=True, show_choices=True)]
+    env: Annotated[Optional[CIS2Environments], typer.Option(show_choices=True)] = None,
+    check_all: Annotated[
+        bool,
+        typer.Option(
+            "--all", help="Check every environment concurrently and report latency"
+        ),
+    ] = False,
+    auth: Annotated[
+        bool,
+        typer.Option(help="With --all, also authenticate with each saved profile"),
+    ] = False,
 ):
     """Pings the /hello_world endpoint of the CIS2 Connection Manager API"""
+    if check_all:
+        health_check(auth)
+        return
+
+    if env is None:
+        env = typer.prompt("Env (dev, int, dep)", type=CIS2Environments)
+
     api_client.ping(env)
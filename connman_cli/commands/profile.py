@@ -8,6 +8,7 @@ import typer
 from typing_extensions import Annotated
 
 from connman_cli.lib import log
+from connman_cli.lib.completion import complete_profile
 from connman_cli.lib.config import define_profiles, get_config
 
 app = typer.Typer()
@@ -34,7 +35,9 @@ def list_profiles():
 
 
 @app.command(name="get")
-def get_profile(profile_name: Annotated[str, typer.Argument()]):
+def get_profile(
+    profile_name: Annotated[str, typer.Argument(autocompletion=complete_profile)]
+):
     """
     Get profile details
     """
@@ -1,24 +1,152 @@
 """
 CIS2 Connection Manager API Client
+
+CLI wrappers around ConnmanClient which log errors and exit
 """
-from json import dumps
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
-import requests
 import typer
 
 from connman_cli.lib import log
+from connman_cli.lib.completion import cache_config_ids
 from connman_cli.lib.constants import CIS2Environments, JWKSSigningAlgorithm
-from connman_cli.lib.token import get_cached_token
+from connman_cli.lib.exceptions import (
+    APIError,
+    CassetteError,
+    InvalidTokenError,
+    MissingArgumentsError,
+    TokenNotFoundError,
+    TransportError,
+)
+from connman_cli.lib.token import CachedTokenProvider, StaticTokenProvider
+
+# requests is imported on first use, so that shell completion stays fast
+# pylint: disable=import-outside-toplevel
+if TYPE_CHECKING:
+    from requests.adapters import BaseAdapter
+
+    from connman_cli.lib.client import AuthResult, ConnmanClient
+    from connman_cli.lib.health import ProbeResult
+    from connman_cli.lib.watch import WatchEvent
+
+
+@dataclass
+class TransportConfig:
+    """Transport settings of the shared clients"""
+
+    record: Optional[Path] = None
+    replay: Optional[Path] = None
+    http2: bool = False
+
+
+_clients: Dict[CIS2Environments, "ConnmanClient"] = {}
+_token_provider = CachedTokenProvider(silent=False)
+_transport_config = TransportConfig()
+
+
+def _log_request(_: str, endpoint: str):
+    if log.enabled(log.INFO):
+        log.info(f"Sending request to endpoint=[bold]{endpoint}[/bold]")
+
+
+def configure_transport(
+    record: Optional[Path] = None, replay: Optional[Path] = None, http2: bool = False
+):
+    """
+    Set the transport of the shared clients, from --record, --replay or --http2
+
+    Open clients are closed, so that every client uses the new transport
+    """
+    close_clients()
+    _transport_config.record = record
+    _transport_config.replay = replay
+    _transport_config.http2 = http2
+
+
+@lru_cache(maxsize=None)
+def get_transport() -> Optional["BaseAdapter"]:
+    """
+    Get the transport set by --record, --replay or --http2
+    """
+    from connman_cli.lib.cassette import Cassette, RecordingAdapter, ReplayAdapter
+
+    replay_path = _transport_config.replay
+    if replay_path:
+        log.info(f"Replaying responses from [bold]{replay_path}[/bold]")
+        return ReplayAdapter(Cassette.load(replay_path))
+
+    record_path = _transport_config.record
+    if record_path:
+        log.info(f"Recording responses to [bold]{record_path}[/bold]")
+        return RecordingAdapter(Cassette(record_path))
+
+    if _transport_config.http2:
+        from connman_cli.lib.http2 import HTTP2Adapter
+
+        try:
+            transport = HTTP2Adapter()
+        except ImportError as exc:
+            log.warn(f"{exc}, falling back to HTTP/1.1")
+            return None
+
+        log.info("Using HTTP/2 where the server supports it")
+        return transport
+
+    return None
+
+
+def is_replaying() -> bool:
+    """
+    Whether responses are replayed from a cassette by --replay
+    """
+    from connman_cli.lib.cassette import ReplayAdapter
+
+    return isinstance(get_transport(), ReplayAdapter)
+
+
+def get_token_provider(token_provider: Any) -> Any:
+    """
+    Get the token provider to use with the transport set by --replay
+    """
+    from connman_cli.lib.redact import REDACTED
+
+    # Recorded session cookies are redacted, so any token will match
+    return StaticTokenProvider(REDACTED) if is_replaying() else token_provider
+
+
+def get_client(env: CIS2Environments) -> "ConnmanClient":
+    """
+    Get the shared client for an environment
+    """
+    from connman_cli.lib.client import ConnmanClient
+
+    client = _clients.get(env)
+    if client is None:
+        client = ConnmanClient(
+            env,
+            token_provider=get_token_provider(_token_provider),
+            on_request=_log_request,
+            transport=get_transport(),
+        )
+        _clients[env] = client
+
+    return client
 
 
-def get_base_api_endpoint(env: CIS2Environments):
+def close_clients():
     """
-    Get the base endpoint for the CIS2 connection manager API
+    Close the shared clients and forget tokens held in memory
     """
-    return (
-        f"https://connectionmanager.nhs{env.value}.auth-ptl.cis2.spineservices.nhs.uk"
-    )
+    for client in _clients.values():
+        client.close()
+
+    _clients.clear()
+    _token_provider.clear()
+    get_transport.cache_clear()
 
 
 def check_required_arguments(env: Optional[CIS2Environments], team_id: Optional[str]):
@@ -32,113 +160,71 @@ def check_required_arguments(env: Optional[CIS2Environments], team_id: Optional[
         raise typer.Exit(1)
 
 
-def _request(
-    # pylint:disable=too-many-arguments
-    env: CIS2Environments,
-    method: str,
-    endpoint: str,
-    headers: Optional[Dict[str, str]] = None,
-    data: Optional[dict] = None,
-    token: Optional[str] = None,
-):
+@contextmanager
+def handle_errors():
     """
-    Wraps a request to the CIS2 Connection Manager API
-    Adds JWT token in __Host-session cookie if provided
+    Log client errors and exit
     """
-    url = f"{get_base_api_endpoint(env)}{endpoint}"
-    log.info(f"Sending request to endpoint=[bold]{endpoint}[/bold]")
-
-    cookies = {}
-    if token is not None:
-        cookies["__Host-session"] = token
-
     try:
-        response = requests.request(
-            method=method,
-            url=url,
-            timeout=30,
-            headers={
-                **(headers or {}),
-                "Accept": "application/json",
-                "Content-Type": "application/json",
-            },
-            cookies=cookies,
-            data=dumps(data) if isinstance(data, dict) else data,
-        )
+        yield
 
-    except Exception as exc:
-        log.error(
-            f"An unexpected error occurred whilst calling the {endpoint} endpoint"
+    except APIError as exc:
+        log.warn(
+            f"Received unexpected response from the {exc.endpoint} endpoint",
+            details=exc.details(),
         )
+        raise typer.Exit(1) from exc
+
+    except TransportError as exc:
+        log.error(str(exc))
         log.exception()
         raise typer.Exit(1) from exc
 
-    if not response.ok:
-        log.warn(f"Received unexpected response from the {endpoint} endpoint")
-        log.print_json(
-            {
-                "Status Code": response.status_code,
-                "Request Headers": dict(response.request.headers),
-                "Request Body": response.request.body,
-                "Headers": dict(response.headers),
-                "Response Body": response.text,
-            }
-        )
-        raise typer.Exit(1)
+    except TokenNotFoundError as exc:
+        raise typer.Exit(1) from exc
 
-    return response
+    except (MissingArgumentsError, CassetteError, InvalidTokenError) as exc:
+        log.error(str(exc))
+        raise typer.Exit(1) from exc
 
 
-def ping(env: CIS2Environments):
+def ping(env: CIS2Environments) -> Optional[Any]:
     """
     Ping the Connection Manager API
     """
-    return _request(
-        env=env,
-        method="GET",
-        endpoint="/api/hello_world",
-    )
+    with handle_errors():
+        return get_client(env).ping()
 
 
-def auth(env: CIS2Environments, secret: str):
+def auth(env: CIS2Environments, secret: str, verify: bool = False) -> "AuthResult":
     """
     Authenticate with the Connection Manager API using a secret
     """
-    headers = {"Authorization": f"SecretAuth {secret}"}
-    return _request(env, "POST", "/api/auth", headers)
+    with handle_errors():
+        return get_client(env).auth(secret, verify=verify)
 
 
-def list_configs(env: CIS2Environments, team_id: str):
+def list_configs(env: CIS2Environments, team_id: str) -> List[str]:
     """
     List configs setup in Connection Manager
     """
     check_required_arguments(env, team_id)
 
-    token = get_cached_token(env, team_id)
-    if not token:
-        raise typer.Exit(1)
+    with handle_errors():
+        config_ids = get_client(env).list_configs(team_id)
 
-    return _request(
-        env=env, method="GET", endpoint=f"/api/configs/{team_id}", token=token["token"]
-    )
+    cache_config_ids(env, team_id, config_ids)
+    return config_ids
 
 
-def get_config(env: CIS2Environments, team_id: str, config_id: str):
+def get_config(env: CIS2Environments, team_id: str, config_id: str) -> Dict[str, Any]:
     """
     Get a single config from connection manager
     """
     check_required_arguments(env, team_id)
 
-    token = get_cached_token(env, team_id)
-    if not token:
-        raise typer.Exit(1)
-
-    return _request(
-        env=env,
-        method="GET",
-        endpoint=f"/api/configs/{team_id}/{config_id}",
-        token=token["token"],
-    )
+    with handle_errors():
+        return get_client(env).get_config(team_id, config_id)
 
 
 def create_config(
@@ -151,35 +237,22 @@ def create_config(
     backchannel_logout_uri: str,
     jwks_uri: str,
     jwks_uri_signing_algorithm: JWKSSigningAlgorithm,
-):
+) -> Dict[str, Any]:
     """
     Create a new config in Connection Manager
     """
     check_required_arguments(env, team_id)
 
-    token = get_cached_token(env, team_id)
-    if token is None:
-        raise typer.Exit(1)
-
-    data = {
-        "client_name": client_name,
-        "redirect_uris": redirect_uri,
-        "backchannel_logout_uri": backchannel_logout_uri,
-        "jwks_uri": jwks_uri,
-        "jwks_uri_signing_algorithm": jwks_uri_signing_algorithm.value,
-    }
-
-    if description is not None:
-        data["description"] = description
-
-    return _request(
-        env=env,
-        token=token["token"],
-        method="POST",
-        endpoint=f"/api/configs/{team_id}",
-        data=data,
-        headers={"Accept": "application/json", "Content-Type": "application/json"},
-    )
+    with handle_errors():
+        return get_client(env).create_config(
+            team_id,
+            client_name,
+            redirect_uris=redirect_uri,
+            backchannel_logout_uri=backchannel_logout_uri,
+            jwks_uri=jwks_uri,
+            jwks_uri_signing_algorithm=jwks_uri_signing_algorithm,
+            description=description,
+        )
 
 
 def update_config(
@@ -188,21 +261,51 @@ def update_config(
     client_name: str,
     config: dict,
     config_hash: str,
-):
+) -> Optional[Any]:
     """
     Update a config in Connection Manager
     """
     check_required_arguments(env, team_id)
 
-    token = get_cached_token(env, team_id)
-    if token is None:
-        raise typer.Exit(1)
+    with handle_errors():
+        return get_client(env).update_config(team_id, client_name, config, config_hash)
+
+
+def watch_configs(
+    # pylint:disable=too-many-arguments
+    env: CIS2Environments,
+    team_id: str,
+    emit: Callable[["WatchEvent"], None],
+    interval: float,
+    max_interval: float,
+    initial: bool = False,
+    max_polls: Optional[int] = None,
+):
+    """
+    Poll Connection Manager and pass config changes to emit
+    """
+    from connman_cli.lib.watch import AdaptiveInterval, ConfigWatcher
+
+    check_required_arguments(env, team_id)
+
+    with handle_errors():
+        watcher = ConfigWatcher(get_client(env), team_id)
+        watcher.run(
+            emit,
+            AdaptiveInterval(interval, max_interval),
+            initial=initial,
+            max_polls=max_polls,
+        )
+
+
+def health_check(
+    envs: List[CIS2Environments],
+    secrets: Optional[Dict[CIS2Environments, Dict[str, str]]] = None,
+) -> List["ProbeResult"]:
+    """
+    Probe several environments concurrently
+    """
+    from connman_cli.lib.health import check_health
 
-    return _request(
-        env=env,
-        token=token["token"],
-        method="PUT",
-        endpoint=f"/api/configs/{team_id}/{client_name}?hash={config_hash}",
-        data=config,
-        headers={"Accept": "application/json", "Content-Type": "application/json"},
-    )
+    with handle_errors():
+        return check_health(get_client, envs, secrets)
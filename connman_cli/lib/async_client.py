@@ -0,0 +1,251 @@
+"""
+Asyncio CIS2 Connection Manager API Client
+
+Requires the optional httpx dependency: pip install connman-cli[async]
+
+Usage:
+
+    async with AsyncConnmanClient(CIS2Environments.dev) as client:
+        configs = await client.get_configs(team_id, await client.list_configs(team_id))
+"""
+# pylint: disable=duplicate-code
+import asyncio
+from json import dumps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from connman_cli.lib.client import (
+    DEFAULT_TIMEOUT,
+    AuthResult,
+    build_config,
+    decode_response,
+    get_base_api_endpoint,
+    get_team_token,
+)
+from connman_cli.lib.constants import (
+    TOKEN_ISSUERS,
+    CIS2Environments,
+    JWKSSigningAlgorithm,
+)
+from connman_cli.lib.exceptions import APIError, TransportError
+from connman_cli.lib.token import (
+    CachedTokenProvider,
+    StaticTokenProvider,
+    decode_token_from_headers,
+)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_MAX_CONNECTIONS = 20
+DEFAULT_MAX_CONCURRENCY = 20
+
+
+class AsyncConnmanClient:
+    """
+    Asyncio CIS2 Connection Manager API client for a single environment
+
+    Requests share a pooled httpx.AsyncClient limited to max_connections,
+    and at most max_concurrency requests are in flight at any one time.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        env: CIS2Environments,
+        client: Optional[Any] = None,
+        token_provider: Optional[Any] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        base_url: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        on_request: Optional[Callable[[str, str], None]] = None,
+    ):
+        if client is None and httpx is None:
+            raise ImportError(
+                "AsyncConnmanClient requires httpx. "
+                "Install it with: pip install connman-cli[async]"
+            )
+
+        self.env = CIS2Environments(env)
+        self.client = client or httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+        self.token_provider = token_provider or CachedTokenProvider()
+        self.base_url = (base_url or get_base_api_endpoint(self.env)).rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.on_request = on_request
+
+        # Created on first use so it binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self.client.aclose()
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[dict] = None,
+        token: Optional[str] = None,
+    ):
+        """
+        Send a request to the CIS2 Connection Manager API
+        Adds JWT token in __Host-session cookie if provided
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        request_headers = {
+            **(headers or {}),
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+        }
+        if token is not None:
+            request_headers["Cookie"] = f"__Host-session={token}"
+
+        async with self._semaphore:
+            if self.on_request is not None:
+                self.on_request(method, endpoint)
+
+            try:
+                response = await self.client.request(
+                    method,
+                    f"{self.base_url}{endpoint}",
+                    headers=request_headers,
+                    content=dumps(data) if isinstance(data, dict) else data,
+                )
+
+            except Exception as exc:
+                raise TransportError(endpoint) from exc
+
+        if not response.is_success:
+            raise APIError(endpoint, response)
+
+        return response
+
+    def _get_token(self, team_id: Optional[str]) -> str:
+        """Get an access token for a team"""
+        return get_team_token(self.token_provider, self.env, team_id)
+
+    async def ping(self) -> Optional[Any]:
+        """
+        Ping the Connection Manager API
+        """
+        return decode_response(await self._request("GET", "/api/hello_world"))
+
+    async def auth(
+        self, secret: str, use_token: bool = False, verify: bool = False
+    ) -> AuthResult:
+        """
+        Authenticate with the Connection Manager API using a secret
+
+        If use_token is set the returned token is used for subsequent calls.
+        If verify is set the token issuer and signature are checked against
+        the environment's Connection Manager.
+        """
+        headers = {"Authorization": f"SecretAuth {secret}"}
+        response = await self._request("POST", "/api/auth", headers)
+
+        token, info = decode_token_from_headers(
+            response.headers, TOKEN_ISSUERS[self.env] if verify else None
+        )
+        if use_token:
+            self.token_provider = StaticTokenProvider(token)
+
+        return AuthResult(env=self.env, token=token, info=info)
+
+    async def list_configs(self, team_id: str) -> List[str]:
+        """
+        List the IDs of configs setup in Connection Manager
+        """
+        token = self._get_token(team_id)
+        response = await self._request("GET", f"/api/configs/{team_id}", token=token)
+
+        return response.json().get("configs", [])
+
+    async def get_config(self, team_id: str, config_id: str) -> Dict[str, Any]:
+        """
+        Get a single config from connection manager
+        """
+        token = self._get_token(team_id)
+        response = await self._request(
+            "GET", f"/api/configs/{team_id}/{config_id}", token=token
+        )
+
+        return response.json()
+
+    async def get_configs(
+        self, team_id: str, config_ids: Iterable[str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get several configs concurrently, keyed by config ID
+        """
+        config_ids = list(config_ids)
+        configs = await asyncio.gather(
+            *(self.get_config(team_id, config_id) for config_id in config_ids)
+        )
+
+        return dict(zip(config_ids, configs))
+
+    async def create_config(
+        self,
+        team_id: str,
+        client_name: str,
+        redirect_uris: List[str],
+        backchannel_logout_uri: str,
+        jwks_uri: str,
+        jwks_uri_signing_algorithm: Union[JWKSSigningAlgorithm, str],
+        description: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a new config in Connection Manager
+        """
+        token = self._get_token(team_id)
+        data = build_config(
+            client_name,
+            redirect_uris,
+            backchannel_logout_uri,
+            jwks_uri,
+            jwks_uri_signing_algorithm,
+            description,
+        )
+
+        response = await self._request(
+            "POST", f"/api/configs/{team_id}", data=data, token=token
+        )
+
+        return response.json()
+
+    async def update_config(
+        self,
+        team_id: str,
+        config_id: str,
+        config: Dict[str, Any],
+        config_hash: str,
+    ) -> Optional[Any]:
+        """
+        Update a config in Connection Manager
+        """
+        token = self._get_token(team_id)
+        response = await self._request(
+            "PUT",
+            f"/api/configs/{team_id}/{config_id}?hash={config_hash}",
+            data=config,
+            token=token,
+        )
+
+        return decode_response(response)
@@ -0,0 +1,113 @@
+"""
+Benchmark helpers
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence
+
+from connman_cli.lib.exceptions import ConnmanError
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence
+    """
+    if not sorted_values:
+        return 0.0
+
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[min(max(rank, 1), len(sorted_values)) - 1]
+
+
+@dataclass
+class BenchmarkResult:
+    """Outcome of a benchmark run"""
+
+    workload: str
+    concurrency: int
+    elapsed: float
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def requests(self) -> int:
+        """Number of completed requests, including errors"""
+        return len(self.latencies) + self.errors
+
+    @property
+    def throughput(self) -> float:
+        """Successful requests per second"""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary of the run, latencies in milliseconds"""
+        latencies = sorted(self.latencies)
+
+        def millis(value: float) -> float:
+            return round(value * 1000, 3)
+
+        return {
+            "workload": self.workload,
+            "concurrency": self.concurrency,
+            "duration_s": round(self.elapsed, 3),
+            "requests": self.requests,
+            "errors": self.errors,
+            "throughput_rps": round(self.throughput, 2),
+            "latency_ms": {
+                "min": millis(latencies[0] if latencies else 0.0),
+                "mean": millis(sum(latencies) / len(latencies) if latencies else 0.0),
+                "p50": millis(percentile(latencies, 50)),
+                "p95": millis(percentile(latencies, 95)),
+                "p99": millis(percentile(latencies, 99)),
+                "max": millis(latencies[-1] if latencies else 0.0),
+            },
+        }
+
+
+def run_benchmark(
+    workload: str,
+    make_operation: Callable[[], Callable[[], Any]],
+    concurrency: int,
+    duration: float,
+) -> BenchmarkResult:
+    """
+    Run an operation repeatedly from concurrent workers for a fixed duration
+
+    make_operation is called once per worker, so each worker can hold
+    its own client and connection pool.
+    """
+    operations = [make_operation() for _ in range(concurrency)]
+
+    def worker(operation: Callable[[], Any], deadline: float):
+        latencies = []
+        errors = 0
+        while perf_counter() < deadline:
+            start = perf_counter()
+            try:
+                operation()
+            except ConnmanError:
+                errors += 1
+                continue
+
+            latencies.append(perf_counter() - start)
+
+        return latencies, errors
+
+    result = BenchmarkResult(workload=workload, concurrency=concurrency, elapsed=0.0)
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = [
+            executor.submit(worker, operation, start + duration)
+            for operation in operations
+        ]
+        for future in futures:
+            latencies, errors = future.result()
+            result.latencies.extend(latencies)
+            result.errors += errors
+
+    result.elapsed = perf_counter() - start
+
+    return result
@@ -0,0 +1,197 @@
+"""
+Cache maintenance
+
+The cache holds access tokens, signing key sets and config IDs used for
+shell completion. Lookups never delete files; expired and old entries are
+removed by prune_cache, which runs whenever a token is cached and from
+the connman cache command.
+"""
+import configparser
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from time import time
+from typing import Any, Dict, List, Optional
+
+from connman_cli.lib.constants import AppPaths
+
+CACHE_SECTION = "connman.cache"
+CACHE_KINDS = ("token", "jwks", "config-ids")
+DEFAULT_MAX_AGE_DAYS = 30
+DEFAULT_MAX_SIZE_KB = 10 * 1024
+
+AGE_BUCKETS = [
+    ("<1h", 60 * 60),
+    ("<1d", 24 * 60 * 60),
+    ("<7d", 7 * 24 * 60 * 60),
+    ("<30d", 30 * 24 * 60 * 60),
+]
+
+
+@dataclass
+class CacheEntry:
+    """A file in the cache"""
+
+    path: Path
+    kind: str
+    size: int
+    modified: float
+    expires: Optional[int] = None
+
+    def expired(self, now: float) -> bool:
+        """Whether the entry has an expiry time which has passed"""
+        return self.expires is not None and self.expires <= now
+
+
+@dataclass
+class CacheLimits:
+    """Size and age caps for the cache"""
+
+    max_age_days: float = DEFAULT_MAX_AGE_DAYS
+    max_size_kb: float = DEFAULT_MAX_SIZE_KB
+
+    @classmethod
+    def from_config(cls) -> "CacheLimits":
+        """Read the caps from the [connman.cache] section of the config file"""
+        config = configparser.ConfigParser()
+        config.read(AppPaths.config_file)
+
+        return cls(
+            max_age_days=config.getfloat(
+                CACHE_SECTION, "max_age_days", fallback=DEFAULT_MAX_AGE_DAYS
+            ),
+            max_size_kb=config.getfloat(
+                CACHE_SECTION, "max_size_kb", fallback=DEFAULT_MAX_SIZE_KB
+            ),
+        )
+
+
+def _classify(name: str) -> CacheEntry:
+    """Work out the kind, and for tokens the expiry time, from a file name"""
+    kind = next((kind for kind in CACHE_KINDS if name.startswith(f"{kind}-")), "other")
+    expires = None
+
+    if kind == "token":
+        timestamp = name.removesuffix(".json").rsplit("-", 1)[-1]
+        expires = int(timestamp) if timestamp.isdigit() else None
+
+    return CacheEntry(path=Path(name), kind=kind, size=0, modified=0, expires=expires)
+
+
+def scan_cache() -> List[CacheEntry]:
+    """List the files in the cache"""
+    if not AppPaths.cache_dir.exists():
+        return []
+
+    entries = []
+    with os.scandir(AppPaths.cache_dir) as directory:
+        for item in directory:
+            if not item.is_file(follow_symlinks=False):
+                continue
+
+            stat = item.stat(follow_symlinks=False)
+            entry = _classify(item.name)
+            entry.path = Path(item.path)
+            entry.size = stat.st_size
+            entry.modified = stat.st_mtime
+            entries.append(entry)
+
+    return entries
+
+
+def cache_stats(
+    entries: Optional[List[CacheEntry]] = None, now: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Entry counts, sizes and an age histogram of the cache
+    """
+    entries = scan_cache() if entries is None else entries
+    now = time() if now is None else now
+
+    kinds: Dict[str, Dict[str, int]] = {}
+    ages = {label: 0 for label, _ in AGE_BUCKETS}
+    ages[f">={AGE_BUCKETS[-1][0][1:]}"] = 0
+
+    for entry in entries:
+        kind = kinds.setdefault(entry.kind, {"entries": 0, "bytes": 0})
+        kind["entries"] += 1
+        kind["bytes"] += entry.size
+
+        age = now - entry.modified
+        label = next(
+            (label for label, limit in AGE_BUCKETS if age < limit), list(ages)[-1]
+        )
+        ages[label] += 1
+
+    return {
+        "path": str(AppPaths.cache_dir),
+        "entries": len(entries),
+        "bytes": sum(entry.size for entry in entries),
+        "expired_tokens": sum(entry.expired(now) for entry in entries),
+        "kinds": kinds,
+        "age_histogram": ages,
+    }
+
+
+def select_prunable(
+    entries: List[CacheEntry], limits: CacheLimits, now: float
+) -> List[CacheEntry]:
+    """
+    Choose entries to remove: expired tokens, entries older than the age
+    cap, then the oldest entries until the cache is within the size cap
+
+    Tokens are only removed once they expire, whatever the caps, since a
+    missing token means logging in again
+    """
+    max_age = limits.max_age_days * 24 * 60 * 60
+    prunable = [
+        entry
+        for entry in entries
+        if entry.expired(now)
+        or (entry.kind != "token" and now - entry.modified > max_age)
+    ]
+    pruned = {entry.path for entry in prunable}
+    remaining = [entry for entry in entries if entry.path not in pruned]
+
+    size = sum(entry.size for entry in remaining)
+    max_size = limits.max_size_kb * 1024
+    evictable = sorted(
+        (entry for entry in remaining if entry.kind != "token"),
+        key=lambda entry: entry.modified,
+    )
+
+    for entry in evictable:
+        if size <= max_size:
+            break
+
+        prunable.append(entry)
+        size -= entry.size
+
+    return prunable
+
+
+def prune_cache(
+    limits: Optional[CacheLimits] = None, dry_run: bool = False
+) -> List[CacheEntry]:
+    """
+    Remove expired, old and excess entries from the cache
+    """
+    limits = limits or CacheLimits.from_config()
+    prunable = select_prunable(scan_cache(), limits, time())
+
+    if not dry_run:
+        for entry in prunable:
+            entry.path.unlink(missing_ok=True)
+
+    return prunable
+
+
+def clear_cache() -> List[CacheEntry]:
+    """
+    Remove every entry from the cache
+    """
+    entries = scan_cache()
+    for entry in entries:
+        entry.path.unlink(missing_ok=True)
+
+    return entries
@@ -0,0 +1,171 @@
+"""
+Record and replay transports
+
+RecordingAdapter saves request/response pairs to a cassette file with
+secrets redacted, and ReplayAdapter serves responses from a cassette
+without touching the network.
+
+Usage:
+
+    client = ConnmanClient(env, transport=ReplayAdapter(Cassette.load(path)))
+"""
+import json
+import threading
+from collections import defaultdict
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPResponse
+
+from connman_cli.lib.exceptions import CassetteError
+from connman_cli.lib.redact import REDACTED, redact_headers
+
+CASSETTE_VERSION = 1
+
+# Bodies are stored decoded, so framing headers are not replayed
+_UNREPLAYED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _text(body: Optional[Union[str, bytes]]) -> Optional[str]:
+    if isinstance(body, bytes):
+        return body.decode("utf-8", errors="replace")
+
+    return body
+
+
+def _key(method: str, url: str, body: Optional[str]) -> Tuple[str, str, str]:
+    return method.upper(), url, body or ""
+
+
+class Cassette:
+    """
+    Recorded request/response pairs
+
+    Identical requests are replayed in the order they were recorded,
+    repeating the last response once the recordings run out.
+    """
+
+    def __init__(self, path: Union[str, Path], interactions: Optional[List] = None):
+        self.path = Path(path)
+        self.interactions: List[Dict[str, Any]] = interactions or []
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(
+            list
+        )
+        self._played: Dict[Tuple[str, str, str], int] = defaultdict(int)
+
+        for interaction in self.interactions:
+            request = interaction["request"]
+            key = _key(request["method"], request["url"], request["body"])
+            self._index[key].append(interaction)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "Cassette":
+        """Load a cassette file"""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise CassetteError(f"Could not read cassette {path}") from exc
+
+        if data.get("version") != CASSETTE_VERSION:
+            raise CassetteError(f"Unsupported cassette version in {path}")
+
+        return cls(path, data["interactions"])
+
+    def save(self):
+        """Write the cassette file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Recorded interactions are never changed, so a copy of the list is
+        # enough to stop concurrent records changing it while it is written
+        with self._lock:
+            interactions = list(self.interactions)
+
+        data = {"version": CASSETTE_VERSION, "interactions": interactions}
+
+        self.path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def record(self, request: PreparedRequest, response: Response):
+        """Record a request/response pair with credentials redacted"""
+        interaction = {
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "headers": redact_headers(dict(request.headers)),
+                "body": _text(request.body),
+            },
+            "response": {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": redact_headers(
+                    {
+                        key: value
+                        for key, value in response.headers.items()
+                        if key.lower() not in _UNREPLAYED_HEADERS
+                    }
+                ),
+                "body": response.text,
+            },
+        }
+
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def play(self, request: PreparedRequest) -> Dict[str, Any]:
+        """Find the recorded response for a request"""
+        key = _key(request.method or "", request.url or "", _text(request.body))
+
+        with self._lock:
+            recorded = self._index.get(key)
+            if not recorded:
+                raise CassetteError(
+                    f"No recorded response for {request.method} {request.url}"
+                )
+
+            position = min(self._played[key], len(recorded) - 1)
+            self._played[key] += 1
+
+        return recorded[position]["response"]
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport that sends requests and records them to a cassette"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, *args, **kwargs):  # pylint: disable=arguments-differ
+        response = super().send(request, *args, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def close(self):
+        super().close()
+        self.cassette.save()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport that serves recorded responses without network access"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, *args, **kwargs):
+        # pylint: disable=arguments-differ,unused-argument
+        recorded = self.cassette.play(request)
+        body = (recorded["body"] or "").encode("utf-8")
+
+        raw = HTTPResponse(
+            body=BytesIO(body),
+            headers=recorded["headers"],
+            status=recorded["status"],
+            reason=recorded.get("reason"),
+            preload_content=False,
+            decode_content=False,
+        )
+
+        return self.build_response(request, raw)
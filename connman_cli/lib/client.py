@@ -0,0 +1,334 @@
+"""
+Embeddable CIS2 Connection Manager API Client
+
+Usage:
+
+    with ConnmanClient(CIS2Environments.dev) as client:
+        client.auth(secret)
+        config_ids = client.list_configs(team_id)
+
+Errors are raised as subclasses of ConnmanError rather than exiting the process.
+"""
+from dataclasses import dataclass
+from http import HTTPStatus
+from json import dumps
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import requests
+from requests.adapters import BaseAdapter
+
+from connman_cli.lib.constants import (
+    TOKEN_ISSUERS,
+    CIS2Environments,
+    JWKSSigningAlgorithm,
+)
+from connman_cli.lib.exceptions import (
+    APIError,
+    ConnmanError,
+    MissingArgumentsError,
+    TokenNotFoundError,
+    TransportError,
+)
+from connman_cli.lib.singleflight import SingleFlight
+from connman_cli.lib.token import (
+    CachedTokenProvider,
+    StaticTokenProvider,
+    decode_token_from_headers,
+)
+
+DEFAULT_TIMEOUT = 30
+
+
+def get_base_api_endpoint(env: CIS2Environments):
+    """
+    Get the base endpoint for the CIS2 connection manager API
+    """
+    return TOKEN_ISSUERS[env]
+
+
+def build_config(
+    # pylint:disable=too-many-arguments
+    client_name: str,
+    redirect_uris: List[str],
+    backchannel_logout_uri: str,
+    jwks_uri: str,
+    jwks_uri_signing_algorithm: Union[JWKSSigningAlgorithm, str],
+    description: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Build the request body for a new config
+    """
+    data = {
+        "client_name": client_name,
+        "redirect_uris": redirect_uris,
+        "backchannel_logout_uri": backchannel_logout_uri,
+        "jwks_uri": jwks_uri,
+        "jwks_uri_signing_algorithm": JWKSSigningAlgorithm(
+            jwks_uri_signing_algorithm
+        ).value,
+    }
+
+    if description is not None:
+        data["description"] = description
+
+    return data
+
+
+def get_team_token(
+    token_provider: Any, env: CIS2Environments, team_id: Optional[str]
+) -> str:
+    """
+    Get an access token for a team from a token provider
+    """
+    if not team_id:
+        raise MissingArgumentsError("Could not determine a team ID.")
+
+    token = token_provider.get_token(env, team_id)
+    if not token:
+        raise TokenNotFoundError(
+            f"No valid access token for team_id={team_id} in env={env.value}"
+        )
+
+    return token
+
+
+@dataclass
+class AuthResult:
+    """Result of a successful secret authentication"""
+
+    env: CIS2Environments
+    token: str
+    info: Dict[str, Any]
+
+    @property
+    def team_ids(self) -> List[str]:
+        """Team IDs the token is valid for"""
+        return self.info["team_ids"]
+
+
+class ConnmanClient:
+    """
+    CIS2 Connection Manager API client for a single environment
+
+    Holds a requests session so that connections are reused between calls,
+    and a token provider used to authorise team scoped endpoints.
+    A transport adapter, such as a ReplayAdapter, replaces the default
+    HTTP transport of the session.
+
+    Concurrent identical GET requests, from threads sharing the client,
+    are sent once and share the decoded response.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        env: CIS2Environments,
+        session: Optional[requests.Session] = None,
+        token_provider: Optional[Any] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        base_url: Optional[str] = None,
+        on_request: Optional[Callable[[str, str], None]] = None,
+        transport: Optional[BaseAdapter] = None,
+    ):
+        self.env = CIS2Environments(env)
+        self.session = session or requests.Session()
+        if transport is not None:
+            self.session.mount("https://", transport)
+            self.session.mount("http://", transport)
+
+        self.token_provider = token_provider or CachedTokenProvider()
+        self.timeout = timeout
+        self.base_url = (base_url or get_base_api_endpoint(self.env)).rstrip("/")
+        self.on_request = on_request
+        self.single_flight = SingleFlight()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """Close the underlying HTTP session"""
+        self.session.close()
+
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]] = None,
+        data: Optional[dict] = None,
+        token: Optional[str] = None,
+    ) -> requests.Response:
+        """
+        Send a request to the CIS2 Connection Manager API
+        Adds JWT token in __Host-session cookie if provided
+        """
+        if self.on_request is not None:
+            self.on_request(method, endpoint)
+
+        cookies = {}
+        if token is not None:
+            cookies["__Host-session"] = token
+
+        try:
+            response = self.session.request(
+                method=method,
+                url=f"{self.base_url}{endpoint}",
+                timeout=self.timeout,
+                headers={
+                    **(headers or {}),
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                },
+                cookies=cookies,
+                data=dumps(data) if isinstance(data, dict) else data,
+            )
+
+        except ConnmanError:
+            raise
+
+        except Exception as exc:
+            raise TransportError(endpoint) from exc
+
+        if not response.ok:
+            raise APIError(endpoint, response)
+
+        return response
+
+    def _get_token(self, team_id: Optional[str]) -> str:
+        """Get an access token for a team"""
+        return get_team_token(self.token_provider, self.env, team_id)
+
+    def _get(self, endpoint: str, team_id: Optional[str] = None) -> Optional[Any]:
+        """
+        Send a GET request and decode the response
+
+        Requests for the same endpoint and team already in flight are
+        joined rather than sent again
+        """
+        token = self._get_token(team_id) if team_id is not None else None
+
+        return self.single_flight.do(
+            (self.env.value, endpoint, team_id),
+            lambda: decode_response(self._request("GET", endpoint, token=token)),
+        )
+
+    def ping(self) -> Optional[Any]:
+        """
+        Ping the Connection Manager API
+        """
+        return self._get("/api/hello_world")
+
+    def auth(
+        self, secret: str, use_token: bool = False, verify: bool = False
+    ) -> AuthResult:
+        """
+        Authenticate with the Connection Manager API using a secret
+
+        If use_token is set the returned token is used for subsequent calls.
+        If verify is set the token issuer and signature are checked against
+        the environment's Connection Manager.
+        """
+        headers = {"Authorization": f"SecretAuth {secret}"}
+        response = self._request("POST", "/api/auth", headers)
+
+        token, info = decode_token_from_headers(
+            response.headers, TOKEN_ISSUERS[self.env] if verify else None
+        )
+        if use_token:
+            self.token_provider = StaticTokenProvider(token)
+
+        return AuthResult(env=self.env, token=token, info=info)
+
+    def list_configs(self, team_id: str) -> List[str]:
+        """
+        List the IDs of configs setup in Connection Manager
+        """
+        return self._get(f"/api/configs/{team_id}", team_id).get("configs", [])
+
+    def get_config(self, team_id: str, config_id: str) -> Dict[str, Any]:
+        """
+        Get a single config from connection manager
+        """
+        return self._get(f"/api/configs/{team_id}/{config_id}", team_id)
+
+    def get_config_if_changed(
+        self, team_id: str, config_id: str, config_hash: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a single config, or None if its hash still matches config_hash
+
+        The hash is sent as an ETag, so servers that support conditional
+        requests can answer with an empty 304 response
+        """
+        token = self._get_token(team_id)
+        response = self._request(
+            "GET",
+            f"/api/configs/{team_id}/{config_id}",
+            headers={"If-None-Match": f'"{config_hash}"'},
+            token=token,
+        )
+
+        if response.status_code == HTTPStatus.NOT_MODIFIED:
+            return None
+
+        config = response.json()
+        return None if config.get("hash") == config_hash else config
+
+    def create_config(
+        self,
+        team_id: str,
+        client_name: str,
+        redirect_uris: List[str],
+        backchannel_logout_uri: str,
+        jwks_uri: str,
+        jwks_uri_signing_algorithm: Union[JWKSSigningAlgorithm, str],
+        description: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Create a new config in Connection Manager
+        """
+        token = self._get_token(team_id)
+        data = build_config(
+            client_name,
+            redirect_uris,
+            backchannel_logout_uri,
+            jwks_uri,
+            jwks_uri_signing_algorithm,
+            description,
+        )
+
+        response = self._request(
+            "POST", f"/api/configs/{team_id}", data=data, token=token
+        )
+
+        return response.json()
+
+    def update_config(
+        self,
+        team_id: str,
+        config_id: str,
+        config: Dict[str, Any],
+        config_hash: str,
+    ) -> Optional[Any]:
+        """
+        Update a config in Connection Manager
+        """
+        token = self._get_token(team_id)
+        response = self._request(
+            "PUT",
+            f"/api/configs/{team_id}/{config_id}?hash={config_hash}",
+            data=config,
+            token=token,
+        )
+
+        return decode_response(response)
+
+
+def decode_response(response: requests.Response) -> Optional[Any]:
+    """Decode a JSON response body, if there is one"""
+    if not response.content:
+        return None
+
+    return response.json()
@@ -0,0 +1,256 @@
+"""
+Shell completion
+
+Completers only read local files, so they never call the API. Config IDs
+are completed from a cache written by earlier config list calls.
+
+Profile names and config IDs are completed by fast_complete before typer
+and the app are imported, so this module must not import them either.
+"""
+import configparser
+import json
+import os
+import shlex
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from connman_cli.lib.constants import AppPaths, CIS2Environments
+
+PROFILE_PREFIX = "connman.profile."
+
+SHELLS = ("bash", "zsh", "fish", "powershell", "pwsh")
+
+# Options taking a value, of the commands whose arguments complete config IDs
+CONFIG_ID_COMMAND_OPTIONS = {
+    ("config", "get"): {"--env", "--team-id"},
+    ("config", "edit"): {
+        "--redirect-uri",
+        "--backchannel-logout-uri",
+        "--jwks-uri",
+        "--jwks-uri-signing-algorithm",
+        "--description",
+        "--env",
+        "--team-id",
+    },
+}
+
+
+def _read_config() -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read(AppPaths.config_file)
+    return config
+
+
+def _config_ids_path(env: str, team_id: str) -> Path:
+    return AppPaths.cache_dir / f"config-ids-{env}-{team_id}.json"
+
+
+def _matching(values: Iterable[str], incomplete: str) -> List[str]:
+    return sorted(value for value in set(values) if value.startswith(incomplete))
+
+
+def cache_config_ids(env: CIS2Environments, team_id: str, config_ids: List[str]):
+    """
+    Save the config IDs of a team for shell completion
+    """
+    AppPaths.cache_dir.mkdir(parents=True, exist_ok=True)
+    _config_ids_path(env.value, team_id).write_text(json.dumps(config_ids))
+
+
+def complete_profile(incomplete: str) -> List[str]:
+    """
+    Complete profile names from the config file
+    """
+    sections = _read_config().sections()
+    return _matching(
+        (
+            section.removeprefix(PROFILE_PREFIX)
+            for section in sections
+            if section.startswith(PROFILE_PREFIX)
+        ),
+        incomplete,
+    )
+
+
+def _selected_env_and_team(
+    env: Optional[str], team_id: Optional[str]
+) -> Tuple[Optional[str], Optional[str]]:
+    """Environment and team ID from the selected profile, or the command line"""
+    config = _read_config()
+    selected = config.get("connman.profile", "selected", fallback=None)
+
+    if selected and config.has_section(selected):
+        return config[selected].get("environment"), config[selected].get("teamid")
+
+    return env, team_id
+
+
+def _complete_config_id(
+    env: Optional[str], team_id: Optional[str], incomplete: str
+) -> List[str]:
+    env, team_id = _selected_env_and_team(env, team_id)
+
+    if env and team_id:
+        paths: Iterable[Path] = [_config_ids_path(env, team_id)]
+    else:
+        paths = AppPaths.cache_dir.glob("config-ids-*.json")
+
+    config_ids: List[str] = []
+    for path in paths:
+        try:
+            config_ids.extend(json.loads(path.read_text()))
+        except (OSError, ValueError):
+            continue
+
+    return _matching(config_ids, incomplete)
+
+
+def complete_config_id(ctx: Any, incomplete: str) -> List[str]:
+    """
+    Complete config IDs from the cache of previous config list calls
+
+    typer passes its context to the parameter named ctx, so typer need not
+    be imported for the annotation
+    """
+    env = ctx.params.get("env")
+    return _complete_config_id(
+        getattr(env, "value", env), ctx.params.get("team_id"), incomplete
+    )
+
+
+def _split_args(string: str) -> List[str]:
+    """Split a command line like click, keeping an unterminated last word"""
+    lexer = shlex.shlex(string, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ""
+    words: List[str] = []
+
+    try:
+        words.extend(lexer)
+    except ValueError:
+        words.append(lexer.token)
+
+    return words
+
+
+def _completion_args(shell: str) -> Tuple[List[str], str]:
+    """The words before the cursor and the incomplete word, as typer reads them"""
+    if shell == "bash":
+        words = _split_args(os.environ.get("COMP_WORDS", ""))
+        cword = int(os.environ.get("COMP_CWORD", "0"))
+        return words[1:cword], words[cword] if cword < len(words) else ""
+
+    line = os.environ.get("_TYPER_COMPLETE_ARGS", "")
+    args = _split_args(line)[1:]
+
+    if shell in ("powershell", "pwsh"):
+        return args, os.environ.get("_TYPER_COMPLETE_WORD_TO_COMPLETE", "")
+
+    if args and not line.endswith(" "):
+        return args[:-1], args[-1]
+
+    return args, ""
+
+
+def _config_id_options(
+    options: Iterable[str], args: List[str]
+) -> Optional[Dict[str, str]]:
+    """
+    Option values before a config ID argument, or None if the argument is
+    not the word being completed
+    """
+    values: Dict[str, str] = {}
+    words = iter(args)
+
+    for word in words:
+        name, equals, value = word.partition("=")
+        if name not in options:
+            # --help, or a config ID argument already given
+            return None
+
+        if not equals:
+            value = next(words, None)
+            if value is None:
+                # Completing the option's value
+                return None
+
+        values[name] = value
+
+    return values
+
+
+def _candidates(args: List[str], incomplete: str) -> Optional[List[str]]:
+    """
+    Complete profile names and config IDs, or None to leave it to typer
+    """
+    if incomplete.startswith("-"):
+        return None
+
+    command, rest = tuple(args[:2]), args[2:]
+
+    if (command == ("auth", "login") and rest[-1:] == ["--profile"]) or (
+        command == ("profile", "get") and not rest
+    ):
+        return complete_profile(incomplete)
+
+    if command not in CONFIG_ID_COMMAND_OPTIONS:
+        return None
+
+    values = _config_id_options(CONFIG_ID_COMMAND_OPTIONS[command], rest)
+    if values is None or values.get("--env", "dev") not in CIS2Environments.__members__:
+        return None
+
+    return _complete_config_id(values.get("--env"), values.get("--team-id"), incomplete)
+
+
+def _format(shell: str, candidates: List[str]) -> str:
+    """Format candidates as typer's completion classes do"""
+    if shell == "zsh":
+        if not candidates:
+            return "_files"
+
+        def escape(value: str) -> str:
+            return (
+                value.replace('"', '""')
+                .replace("'", "''")
+                .replace("$", "\\$")
+                .replace("`", "\\`")
+            )
+
+        items = "\n".join(f'"{escape(value)}"' for value in candidates)
+        return f"_arguments '*: :(({items}))'"
+
+    if shell in ("powershell", "pwsh"):
+        return "\n".join(f"{value}::: " for value in candidates)
+
+    return "\n".join(candidates)
+
+
+def fast_complete(instruction: str) -> bool:
+    """
+    Answer a completion request without importing typer, if it completes a
+    profile name or config ID
+
+    Returns False, having written nothing, for anything else, which is
+    then completed by typer.
+    """
+    action, _, shell = instruction.partition("_")
+    if action != "complete" or shell not in SHELLS:
+        return False
+
+    # Global options before the command are left to typer too
+    candidates = _candidates(*_completion_args(shell))
+    if candidates is None:
+        return False
+
+    if shell == "fish":
+        fish_action = os.environ.get("_TYPER_COMPLETE_FISH_ACTION", "")
+        if fish_action == "is-args":
+            sys.exit(0 if candidates else 1)
+        if fish_action != "get-args" or not candidates:
+            sys.stdout.write("\n")
+            return True
+
+    sys.stdout.write(_format(shell, candidates) + "\n")
+    return True
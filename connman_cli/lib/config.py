@@ -7,7 +7,6 @@ import typer
 
 from connman_cli.lib import api_client, log
 from connman_cli.lib.constants import AppPaths, CIS2Environments
-from connman_cli.lib.token import decode_token_from_headers
 
 
 def write_config(config: configparser.ConfigParser):
@@ -67,8 +66,7 @@ def define_profiles(config: configparser.ConfigParser):
     ).strip()
 
     try:
-        response = api_client.auth(env, secret)
-        _, token_info = decode_token_from_headers(response.headers)
+        token_info = api_client.auth(env, secret).info
         log.success(
             f"This profile is valid for the following team IDs: {token_info['team_ids']}"
         )
@@ -86,11 +84,11 @@ def define_profiles(config: configparser.ConfigParser):
 
         return None
 
-    except Exception as exc:  # pylint: disable=broad-exception-caught
+    except Exception:  # pylint: disable=broad-exception-caught
         log.error(
             f"Failed to validate the provided secret against the {env.value} environment.",
         )
-        log.exception(exc)
+        log.exception()
         if typer.confirm("Would you like to try again?"):
             return define_profiles(config)
 
@@ -30,6 +30,15 @@ class CIS2Environments(str, Enum):
     dep = "dep"
 
 
+# The Connection Manager of each environment, which serves the API and issues
+# its access tokens. Their signing keys are found from the jwks_uri of its
+# /.well-known/openid-configuration discovery document
+TOKEN_ISSUERS = {
+    env: f"https://connectionmanager.nhs{env.value}.auth-ptl.cis2.spineservices.nhs.uk"
+    for env in CIS2Environments
+}
+
+
 class JWKSSigningAlgorithm(str, Enum):
     """
     JWKS Signing Algorithms
@@ -37,3 +46,62 @@ class JWKSSigningAlgorithm(str, Enum):
 
     RS256 = "RS256"
     RS512 = "RS512"
+
+
+class BenchWorkload(str, Enum):
+    """
+    Benchmark Workloads
+    """
+
+    # pylint: disable=invalid-name
+
+    ping = "ping"
+    list = "list"
+    get = "get"
+
+
+class ProfileFormat(str, Enum):
+    """
+    Profile Output Formats
+    """
+
+    # pylint: disable=invalid-name
+
+    pstats = "pstats"
+    speedscope = "speedscope"
+
+
+class WatchEventType(str, Enum):
+    """
+    Config Watch Events
+    """
+
+    # pylint: disable=invalid-name
+
+    created = "created"
+    updated = "updated"
+    deleted = "deleted"
+
+
+class LogLevel(str, Enum):
+    """
+    Log Levels
+    """
+
+    # pylint: disable=invalid-name
+
+    debug = "debug"
+    info = "info"
+    warning = "warning"
+    error = "error"
+
+
+class LogFormat(str, Enum):
+    """
+    Log Output Formats
+    """
+
+    # pylint: disable=invalid-name
+
+    text = "text"
+    json = "json"
@@ -0,0 +1,62 @@
+"""
+Connman exceptions
+"""
+from typing import Any, Dict, Optional
+
+from connman_cli.lib.redact import redact_headers
+
+
+class ConnmanError(Exception):
+    """Base exception for all Connman client errors"""
+
+
+class MissingArgumentsError(ConnmanError):
+    """An environment or team ID could not be determined"""
+
+
+class TokenNotFoundError(ConnmanError):
+    """No valid access token is available for the requested environment and team"""
+
+
+class InvalidTokenError(ConnmanError):
+    """An access token could not be decoded or verified"""
+
+
+class TransportError(ConnmanError):
+    """The request could not be sent to the Connection Manager API"""
+
+    def __init__(self, endpoint: str, message: Optional[str] = None):
+        super().__init__(
+            message
+            or f"An unexpected error occurred whilst calling the {endpoint} endpoint"
+        )
+        self.endpoint = endpoint
+
+
+class APIError(ConnmanError):
+    """The Connection Manager API returned an unsuccessful response"""
+
+    def __init__(self, endpoint: str, response: Any):
+        super().__init__(
+            f"Received unexpected response from the {endpoint} endpoint "
+            f"(status_code={response.status_code})"
+        )
+        self.endpoint = endpoint
+        self.response = response
+        self.status_code: int = response.status_code
+
+    def details(self) -> Dict[str, Any]:
+        """Request and response details for troubleshooting, without credentials"""
+        request = self.response.request
+        return {
+            "Status Code": self.response.status_code,
+            "Request Headers": redact_headers(request.headers),
+            # requests exposes the sent body as .body, httpx as .content
+            "Request Body": getattr(request, "body", getattr(request, "content", None)),
+            "Headers": redact_headers(self.response.headers),
+            "Response Body": self.response.text,
+        }
+
+
+class CassetteError(ConnmanError):
+    """A cassette could not be read, or has no recording for a request"""
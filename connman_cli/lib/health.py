@@ -0,0 +1,133 @@
+"""
+Health checks
+
+Probes several Connection Manager environments at once. Each environment
+is checked on its own thread with its own client, and the checks for an
+environment run in turn so that they share a kept-alive connection.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import APIError, ConnmanError
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a single health check"""
+
+    env: CIS2Environments
+    check: str
+    ok: bool
+    latency_ms: float
+    status_code: Optional[int] = None
+    reused_connection: Optional[bool] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Result as a JSON serialisable dictionary"""
+        return {
+            "env": self.env.value,
+            "check": self.check,
+            "ok": self.ok,
+            "latency_ms": round(self.latency_ms, 2),
+            "status_code": self.status_code,
+            "reused_connection": self.reused_connection,
+            "error": self.error,
+        }
+
+
+def _connection_count(client: ConnmanClient) -> Optional[int]:
+    """Connections opened by the client's pools, None for other transports"""
+    adapter = client.session.get_adapter(client.base_url)
+    manager = getattr(adapter, "poolmanager", None)
+    if manager is None:
+        return None
+
+    # Pools are keyed by TLS settings as well as the host, and the keys differ
+    # between requests versions, so count the connections of every pool. The
+    # client only talks to one host, so these are all its connections.
+    pools = manager.pools
+    return sum(pools[key].num_connections for key in pools.keys() if key in pools)
+
+
+def probe(
+    client: ConnmanClient, check: str, call: Callable[[ConnmanClient], Any]
+) -> ProbeResult:
+    """
+    Time a call against the client, recording its status code and whether
+    it was sent over an existing connection
+    """
+    status_codes: List[int] = []
+
+    def record_status(response, *_, **__):
+        status_codes.append(response.status_code)
+
+    client.session.hooks["response"].append(record_status)
+    connections = _connection_count(client)
+    start = perf_counter()
+
+    try:
+        call(client)
+        error = None
+    except ConnmanError as exc:
+        error = str(exc)
+        if isinstance(exc, APIError):
+            status_codes.append(exc.status_code)
+    finally:
+        latency = (perf_counter() - start) * 1000
+        client.session.hooks["response"].remove(record_status)
+
+    # Without a response there was no connection to reuse
+    after = _connection_count(client) if status_codes else None
+    return ProbeResult(
+        env=client.env,
+        check=check,
+        ok=error is None,
+        latency_ms=latency,
+        status_code=status_codes[-1] if status_codes else None,
+        reused_connection=None if after is None else after == connections,
+        error=error,
+    )
+
+
+def _check_env(client: ConnmanClient, secrets: Dict[str, str]) -> List[ProbeResult]:
+    results = [probe(client, "ping", lambda client: client.ping())]
+
+    # A failed ping means the environment is down, so skip the auth checks
+    if results[0].ok:
+        for profile, secret in secrets.items():
+            results.append(
+                probe(
+                    client,
+                    f"auth:{profile}",
+                    lambda client, secret=secret: client.auth(secret),
+                )
+            )
+
+    return results
+
+
+def check_health(
+    get_client: Callable[[CIS2Environments], ConnmanClient],
+    envs: List[CIS2Environments],
+    secrets: Optional[Dict[CIS2Environments, Dict[str, str]]] = None,
+) -> List[ProbeResult]:
+    """
+    Ping each environment concurrently, and authenticate with the secret
+    of each profile given for that environment
+    """
+    secrets = secrets or {}
+    if not envs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=len(envs)) as executor:
+        futures = [
+            executor.submit(_check_env, get_client(env), secrets.get(env, {}))
+            for env in envs
+        ]
+
+        return [result for future in futures for result in future.result()]
@@ -0,0 +1,198 @@
+"""
+HTTP/2 transport
+
+Requires the optional httpx and h2 dependencies: pip install connman-cli[http2]
+
+HTTP2Adapter sends requests from a ConnmanClient over httpx, so concurrent
+requests are multiplexed over one connection per host. HTTP/2 is negotiated
+with TLS ALPN, and servers that do not offer it are spoken to over HTTP/1.1.
+
+Usage:
+
+    client = ConnmanClient(env, transport=HTTP2Adapter())
+"""
+import asyncio
+import os
+import ssl
+import threading
+from typing import Any, Coroutine, Dict, Optional, Tuple, Union
+
+from requests import ConnectionError as RequestsConnectionError
+from requests import PreparedRequest, Response, Timeout
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, select_proxy
+
+try:
+    import h2  # pylint: disable=unused-import
+    import httpx
+except ImportError:
+    httpx = None
+
+DEFAULT_MAX_CONNECTIONS = 10
+
+Cert = Union[None, str, Tuple[str, str]]
+
+
+def _timeout(
+    timeout: Union[None, float, Tuple[Optional[float], Optional[float]]]
+) -> "httpx.Timeout":
+    """Convert a requests (connect, read) timeout to a httpx timeout"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+
+    return httpx.Timeout(timeout)
+
+
+def _ssl_context(verify: Union[bool, str], cert: Cert) -> ssl.SSLContext:
+    """
+    Convert the requests verify and cert arguments to a SSL context
+
+    As with requests, verify is a CA bundle file or directory, or True for
+    the certifi bundle, and cert is a client certificate file or a
+    (certificate, key) pair.
+    """
+    if verify:
+        ca_bundle = DEFAULT_CA_BUNDLE_PATH if verify is True else verify
+        is_dir = os.path.isdir(ca_bundle)
+        context = ssl.create_default_context(
+            cafile=None if is_dir else ca_bundle, capath=ca_bundle if is_dir else None
+        )
+    else:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    if isinstance(cert, tuple):
+        context.load_cert_chain(*cert)
+    elif cert:
+        context.load_cert_chain(cert)
+
+    return context
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport that sends requests over HTTP/2 where the server supports it
+
+    prior_knowledge skips negotiation and speaks HTTP/2 to plain http://
+    servers, which is only useful against local test servers.
+
+    TLS verification, client certificates and proxies are taken from each
+    request, as resolved by the requests session from its settings and from
+    REQUESTS_CA_BUNDLE and the proxy environment variables. A httpx client
+    is kept for each combination of them.
+
+    httpx's synchronous HTTP/2 connections cannot be shared between threads,
+    so requests are sent from an event loop on a background thread, and the
+    calling thread waits for the response.
+    """
+
+    def __init__(
+        self,
+        prior_knowledge: bool = False,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "HTTP/2 support requires httpx and h2: pip install connman-cli[http2]"
+            )
+
+        super().__init__()
+        self.prior_knowledge = prior_knowledge
+        self.max_connections = max_connections
+        self.clients: Dict[
+            Tuple[Union[bool, str], Cert, Optional[str]], "httpx.AsyncClient"
+        ] = {}
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+    def get_client(
+        self, verify: Union[bool, str], cert: Cert, proxy: Optional[str]
+    ) -> "httpx.AsyncClient":
+        """Get the httpx client for a combination of TLS and proxy settings"""
+        key = (verify, cert, proxy)
+
+        with self._lock:
+            client = self.clients.get(key)
+            if client is None:
+                client = self.clients[key] = httpx.AsyncClient(
+                    transport=httpx.AsyncHTTPTransport(
+                        verify=_ssl_context(verify, cert),
+                        http1=not self.prior_knowledge,
+                        http2=True,
+                        limits=httpx.Limits(max_connections=self.max_connections),
+                        proxy=httpx.Proxy(proxy) if proxy else None,
+                    ),
+                    # The session has already applied the environment settings
+                    trust_env=False,
+                )
+
+        return client
+
+    def _run(self, coroutine: Coroutine) -> Any:
+        """Run a coroutine on the event loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def send(
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        # pylint: disable=too-many-arguments
+        if isinstance(cert, list):
+            cert = (cert[0], cert[1])
+
+        try:
+            client = self.get_client(
+                verify, cert, select_proxy(request.url or "", proxies)
+            )
+            response = self._run(
+                client.request(
+                    request.method or "GET",
+                    request.url or "",
+                    headers=dict(request.headers),
+                    content=request.body,
+                    timeout=_timeout(timeout),
+                )
+            )
+        except httpx.TimeoutException as exc:
+            raise Timeout(exc, request=request) from exc
+        except (httpx.HTTPError, OSError) as exc:
+            raise RequestsConnectionError(exc, request=request) from exc
+
+        return self.build_response(request, response)
+
+    @staticmethod
+    def build_response(request: PreparedRequest, response: "httpx.Response"):
+        """Convert a httpx response to a requests response"""
+        result = Response()
+        result.status_code = response.status_code
+        result.reason = response.reason_phrase
+        result.headers = CaseInsensitiveDict(response.headers)
+        result.encoding = response.encoding
+        result.url = str(response.url)
+        result.request = request
+        # pylint: disable=protected-access
+        result._content = response.content
+        result.http_version = response.http_version
+
+        return result
+
+    def close(self):
+        # Clients for each environment share the transport, and all close it
+        if self._loop.is_closed():
+            return
+
+        for client in self.clients.values():
+            self._run(client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,55 +1,251 @@
 """
 Logging utils
+
+Logging is configured once at startup, by the app callback or from the
+CONNMAN_* environment variables. Messages below the configured level return
+before any formatting, and --quiet silences everything except command output.
+With the json log format, log records are written to stderr as JSON lines.
 """
+import json
 import os
-from typing import Any
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Optional
+
+from connman_cli.lib.constants import LogFormat, LogLevel
+
+DEBUG = 10
+INFO = 20
+SUCCESS = 25
+WARNING = 30
+ERROR = 40
+SILENT = 100
+
+LEVELS = {
+    LogLevel.debug: DEBUG,
+    LogLevel.info: INFO,
+    LogLevel.warning: WARNING,
+    LogLevel.error: ERROR,
+}
+
+_LABELS = {
+    DEBUG: ("DEBUG", "bright_black"),
+    INFO: ("INFO", "blue"),
+    SUCCESS: ("SUCCESS", "green"),
+    WARNING: ("WARNING", "yellow"),
+    ERROR: ("ERROR", "red"),
+}
+
+_TAG = re.compile(r"\[(/?)([^\[\]]*)\]")
+
+
+@dataclass
+class LogConfig:
+    """Logging settings"""
+
+    level: int = DEBUG
+    log_format: LogFormat = LogFormat.text
+    colour: bool = False
+    stderr: bool = False
+
+
+_config = LogConfig()
+
+
+def _truthy(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def configure(
+    level: LogLevel = LogLevel.debug,
+    log_format: LogFormat = LogFormat.text,
+    colour: bool = False,
+    silent: bool = False,
+):
+    """Set the log level, format and colour"""
+    _config.level = SILENT if silent else LEVELS[LogLevel(level)]
+    _config.log_format = LogFormat(log_format)
+    _config.colour = colour
+    _config.stderr = False
+    get_console.cache_clear()
+
+
+def use_stderr():
+    """
+    Write log messages to stderr, for commands whose stdout is a data stream
+    """
+    _config.stderr = True
+
+
+def configure_from_env():
+    """
+    Configure logging from CONNMAN_SILENT, CONNMAN_COLOUR, CONNMAN_LOG_LEVEL
+    and CONNMAN_LOG_FORMAT
+    """
+    level = os.getenv("CONNMAN_LOG_LEVEL", LogLevel.debug.value)
+    log_format = os.getenv("CONNMAN_LOG_FORMAT", LogFormat.text.value)
+
+    configure(
+        level=LogLevel(level) if level in LogLevel.__members__ else LogLevel.debug,
+        log_format=LogFormat(log_format)
+        if log_format in LogFormat.__members__
+        else LogFormat.text,
+        colour=_truthy(os.getenv("CONNMAN_COLOUR")),
+        silent=_truthy(os.getenv("CONNMAN_SILENT")),
+    )
+
+
+def enabled(level: int) -> bool:
+    """Whether messages at a level are logged, to guard costly messages"""
+    return level >= _config.level
+
+
+@lru_cache(maxsize=None)
+def get_console(stderr: bool = False):
+    """
+    Get the rich console, importing rich on first use to keep startup fast
+    """
+    from rich.console import Console  # pylint: disable=import-outside-toplevel
+
+    return Console(stderr=stderr, no_color=not _config.colour)
+
+
+def _strip_tag(match: "re.Match[str]") -> str:
+    closing, tag = match.groups()
+    if not tag:
+        return "" if closing else match.group(0)
+
+    # pylint: disable=import-outside-toplevel
+    from rich.errors import StyleSyntaxError
+    from rich.style import Style
+
+    try:
+        Style.parse(tag)
+    except StyleSyntaxError:
+        return match.group(0)
+
+    return ""
 
-from rich.console import Console
 
-console = Console()
+def _plain(text: str) -> str:
+    """
+    Remove rich markup from a message, keeping bracketed text such as [dev]
+    which is not a style
+    """
+    return _TAG.sub(_strip_tag, text) if "[" in text else text
 
 
-def print(text, force: bool = False):  # pylint: disable=redefined-builtin
-    """Basic console print"""
-    highlight = os.getenv("CONNMAN_COLOUR") == "True"
-    if os.getenv("CONNMAN_SILENT", "False") != "True" or force:
-        console.print(text, highlight=highlight, markup=highlight)
+def _write_record(level: int, text: Any, **fields: Any):
+    """Write a log record to stderr as a JSON line"""
+    record = {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "level": _LABELS[level][0].lower(),
+        "message": _plain(str(text)),
+        **fields,
+    }
+    sys.stderr.write(json.dumps(record, default=str) + "\n")
+    sys.stderr.flush()
+
+
+def _log(level: int, text: str, details: Any = None):
+    if _config.log_format == LogFormat.json:
+        _write_record(level, text, **({} if details is None else {"details": details}))
+        return
+
+    console = get_console(_config.stderr)
+    label, style = _LABELS[level]
+    console.print(
+        f"[{style}][bold]{label}[/bold]\t {text}[/{style}]",
+        highlight=_config.colour,
+    )
+    if details is not None:
+        console.print_json(data=details, highlight=_config.colour)
+
+
+def print(  # pylint: disable=redefined-builtin
+    text, force: bool = False, err: bool = False
+):
+    """
+    Basic console print
+
+    Forced prints are command output, and are shown even when silent
+    """
+    if not force and _config.level > INFO:
+        return
+
+    # Diagnostics on stderr would break a stream of JSON log records
+    if _config.log_format == LogFormat.json and (err or not force):
+        _write_record(INFO, text)
+        return
+
+    get_console(err or (_config.stderr and not force)).print(
+        text, highlight=_config.colour
+    )
 
 
 def debug(text: str) -> None:
     "Debug log"
-    print(f"[bright_black][bold]DEBUG[/bold]\t {text}[/bright_black]")
+    if _config.level <= DEBUG:
+        _log(DEBUG, text)
 
 
 def success(text: str) -> None:
     """Success log"""
-    print(f"[green][bold]SUCCESS[/bold]\t {text}[/green]")
+    if _config.level <= SUCCESS:
+        _log(SUCCESS, text)
 
 
 def info(text: str) -> None:
     """Info log"""
-    print(f"[blue][bold]INFO[/bold]\t {text}[/blue]")
+    if _config.level <= INFO:
+        _log(INFO, text)
 
 
-def warn(text: str) -> None:
-    """Warn log"""
-    print(f"[yellow][bold]WARNING[/bold]\t {text}[/yellow]")
+def warn(text: str, details: Any = None) -> None:
+    """Warn log, followed by details as JSON if given"""
+    if _config.level <= WARNING:
+        _log(WARNING, text, details)
 
 
 def error(text: str) -> None:
     """Error log"""
-    print(f"[red][bold]ERROR[/bold]\t {text}[/red]")
+    if _config.level <= ERROR:
+        _log(ERROR, text)
 
 
 def exception(force: bool = False):
-    """Print an exception"""
-    if os.getenv("CONNMAN_SILENT", "0") != "1" or force:
-        console.print_exception()
+    """Print the exception being handled"""
+    if not force and _config.level > ERROR:
+        return
+
+    if _config.log_format == LogFormat.json:
+        import traceback  # pylint: disable=import-outside-toplevel
+
+        _write_record(ERROR, "Unhandled exception", exception=traceback.format_exc())
+        return
+
+    get_console(_config.stderr).print_exception()
 
 
 def print_json(entries: Any, force: bool = False):
-    """Print JSON output"""
-    if os.getenv("CONNMAN_SILENT", "0") != "1" or force:
-        console.print_json(
-            data=entries, highlight=os.getenv("CONNMAN_COLOUR") == "True"
-        )
+    """
+    Print JSON output
+
+    Forced JSON is command output, otherwise it is logged at info level
+    """
+    if not force and _config.level > INFO:
+        return
+
+    if not force and _config.log_format == LogFormat.json:
+        _write_record(INFO, "", data=entries)
+        return
+
+    get_console(_config.stderr and not force).print_json(
+        data=entries, highlight=_config.colour
+    )
+
+
+configure_from_env()
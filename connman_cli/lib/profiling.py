@@ -0,0 +1,238 @@
+"""
+Command profiling
+
+Usage: connman --profile-run connman.prof config list
+"""
+import cProfile
+import json
+import pstats
+import sys
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+from connman_cli.lib import log
+from connman_cli.lib.constants import ProfileFormat
+
+SUMMARY_LIMIT = 10
+
+Frame = Tuple[str, str, int]
+
+
+def _print(text: str):
+    """Print diagnostics to stderr, so command output can still be piped"""
+    log.print(text, force=True, err=True)
+
+
+def _frame_name(frame: Frame) -> str:
+    name, file, line = frame
+    if line == 0:
+        return name
+
+    return f"{name} ({Path(file).name}:{line})"
+
+
+class EventRecorder:
+    """
+    Records function entry and exit events for the speedscope evented format
+
+    cProfile only keeps aggregate timings, so call stacks are recorded
+    with sys.setprofile instead.
+    """
+
+    def __init__(self):
+        self.frames: Dict[Frame, int] = {}
+        self.events: List[Tuple[str, int, float]] = []
+        self._stack: List[int] = []
+        self._start = 0.0
+        self.elapsed = 0.0
+
+    def _profile(self, frame, event, arg):
+        now = perf_counter() - self._start
+
+        if event in ("return", "c_return", "c_exception"):
+            # Frames entered before profiling started are not tracked
+            if self._stack:
+                self.events.append(("C", self._stack.pop(), now))
+            return
+
+        if event == "call":
+            code = frame.f_code
+            key = (code.co_name, code.co_filename, code.co_firstlineno)
+        else:
+            key = (getattr(arg, "__qualname__", repr(arg)), "<built-in>", 0)
+
+        index = self.frames.setdefault(key, len(self.frames))
+        self._stack.append(index)
+        self.events.append(("O", index, now))
+
+    def enable(self):
+        """Start recording"""
+        self._start = perf_counter()
+        sys.setprofile(self._profile)
+
+    def disable(self):
+        """Stop recording and close any open frames"""
+        sys.setprofile(None)
+        self.elapsed = perf_counter() - self._start
+
+        while self._stack:
+            self.events.append(("C", self._stack.pop(), self.elapsed))
+
+    def self_times(self) -> Dict[Frame, Tuple[int, float]]:
+        """Call count and self time of each frame"""
+        frames = list(self.frames)
+        totals: Dict[int, List[float]] = defaultdict(lambda: [0, 0.0])
+        stack: List[int] = []
+        last = 0.0
+
+        for event, index, at in self.events:
+            if stack:
+                totals[stack[-1]][1] += at - last
+            last = at
+
+            if event == "O":
+                totals[index][0] += 1
+                stack.append(index)
+            else:
+                stack.pop()
+
+        return {
+            frames[index]: (int(calls), duration)
+            for index, (calls, duration) in totals.items()
+        }
+
+    def dump_speedscope(self, path: Path, name: str):
+        """Write a speedscope file"""
+        data = {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "connman-cli",
+            "shared": {
+                "frames": [
+                    {"name": frame[0], "file": frame[1], "line": frame[2]}
+                    for frame in self.frames
+                ]
+            },
+            "profiles": [
+                {
+                    "type": "evented",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": self.elapsed,
+                    "events": [
+                        {"type": event, "frame": index, "at": at}
+                        for event, index, at in self.events
+                    ],
+                }
+            ],
+        }
+
+        path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class CommandProfiler:
+    """
+    Profile a command, write the profile and print a summary of hot spots
+    """
+
+    def __init__(
+        self,
+        output: Path,
+        output_format: ProfileFormat = ProfileFormat.pstats,
+        memory: bool = False,
+    ):
+        self.output = output
+        self.output_format = output_format
+        self.memory = memory
+        self._profiler: Optional[cProfile.Profile] = None
+        self._recorder: Optional[EventRecorder] = None
+
+    def start(self):
+        """Start profiling"""
+        if self.memory:
+            tracemalloc.start()
+
+        if self.output_format == ProfileFormat.speedscope:
+            self._recorder = EventRecorder()
+            self._recorder.enable()
+        else:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self):
+        """Stop profiling, write the profile and print the summary"""
+        if self._recorder is not None:
+            self._recorder.disable()
+        if self._profiler is not None:
+            self._profiler.disable()
+
+        # Snapshot before the profile is processed, which allocates heavily
+        allocations = self._take_snapshot() if self.memory else None
+
+        if self._recorder is not None:
+            hot_spots = sorted(
+                self._recorder.self_times().items(),
+                key=lambda item: item[1][1],
+                reverse=True,
+            )
+            self._recorder.dump_speedscope(self.output, " ".join(sys.argv))
+            self._print_hot_spots(
+                [
+                    (_frame_name(frame), calls, duration)
+                    for frame, (calls, duration) in hot_spots[:SUMMARY_LIMIT]
+                ]
+            )
+
+        if self._profiler is not None:
+            self._profiler.dump_stats(self.output)
+            stats = pstats.Stats(self._profiler)
+            hot_spots = sorted(
+                stats.stats.items(),  # pylint: disable=no-member
+                key=lambda item: item[1][2],
+                reverse=True,
+            )
+            self._print_hot_spots(
+                [
+                    (_frame_name((func[2], func[0], func[1])), calls, tottime)
+                    for func, (_, calls, tottime, _, _) in hot_spots[:SUMMARY_LIMIT]
+                ]
+            )
+
+        if allocations is not None:
+            self._print_allocations(*allocations)
+
+        _print(f"Profile saved to [bold]{self.output}[/bold]")
+
+    @staticmethod
+    def _print_hot_spots(hot_spots: List[Tuple[str, int, float]]):
+        _print("[bold]--------- Hot Spots (self time) ---------[/bold]")
+        for name, calls, duration in hot_spots:
+            _print(f"{duration * 1000:10.2f} ms {calls:8d} calls  {name}")
+
+    @staticmethod
+    def _take_snapshot() -> Tuple[int, tracemalloc.Snapshot]:
+        """Peak traced memory, and allocations made outside the profilers"""
+        _, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [
+                tracemalloc.Filter(False, path)
+                for path in (__file__, cProfile.__file__, pstats.__file__)
+            ]
+        )
+        tracemalloc.stop()
+
+        return peak, snapshot
+
+    @staticmethod
+    def _print_allocations(peak: int, snapshot: tracemalloc.Snapshot):
+        _print("[bold]--------- Allocations ---------[/bold]")
+        _print(f"Peak traced memory: {peak / 1024:.1f} KiB")
+        for stat in snapshot.statistics("lineno")[:SUMMARY_LIMIT]:
+            frame = stat.traceback[0]
+            _print(
+                f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  "
+                f"{Path(frame.filename).name}:{frame.lineno}"
+            )
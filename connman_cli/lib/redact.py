@@ -0,0 +1,47 @@
+"""
+Credential redaction
+
+Removes secrets and session tokens from HTTP headers before they are
+written anywhere, such as cassette files or log records.
+"""
+import base64
+import re
+from typing import Dict, Mapping
+
+REDACTED = "REDACTED"
+
+_SESSION_COOKIE = re.compile(r"(__Host-session=)([^;,\s]+)")
+
+
+def redact_token(token: str) -> str:
+    """
+    Replace the signature of a JWT so the token can no longer be used
+
+    The claims are kept so that replayed logins can still be decoded.
+    """
+    parts = token.split(".")
+    if len(parts) != 3:
+        return REDACTED
+
+    header = base64.urlsafe_b64encode(b'{"alg":"none","typ":"JWT"}').rstrip(b"=")
+    return f"{header.decode()}.{parts[1]}."
+
+
+def redact_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    """Redact credentials from request or response headers"""
+    redacted = {}
+    for key, value in headers.items():
+        name = key.lower()
+        if name == "authorization":
+            scheme = value.split(" ", 1)[0]
+            value = f"{scheme} {REDACTED}"
+        elif name == "cookie":
+            value = _SESSION_COOKIE.sub(rf"\g<1>{REDACTED}", value)
+        elif name == "set-cookie":
+            value = _SESSION_COOKIE.sub(
+                lambda match: match.group(1) + redact_token(match.group(2)), value
+            )
+
+        redacted[key] = value
+
+    return redacted
@@ -0,0 +1,64 @@
+"""
+Request coalescing
+
+SingleFlight runs one call per key at a time. Callers that ask for a key
+which is already in flight wait for that call and share its result,
+instead of sending an identical request of their own.
+"""
+import copy
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:  # pylint: disable=too-few-public-methods
+    """
+    Coalesces concurrent calls with the same key into a single call
+
+    The caller that made the call receives the result itself, and callers
+    that joined it each receive their own copy, so callers can modify
+    their result without affecting each other. If the call fails, every
+    waiting caller receives the exception.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self._joined: Dict[Hashable, int] = {}
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Call function, or wait for the call already in flight for key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self._joined[key] = 0
+            else:
+                self._joined[key] += 1
+                self.shared += 1
+
+        if not leader:
+            # The shared result is only ever read, callers modify their own copy
+            return copy.deepcopy(future.result())
+
+        try:
+            result = function()
+        except BaseException as exc:
+            self._finish(key)
+            future.set_exception(exc)
+            raise
+
+        # Uncontended calls are not copied. Otherwise the waiters share a
+        # snapshot, since the caller may modify the result straight away
+        joined = self._finish(key)
+        future.set_result(copy.deepcopy(result) if joined else result)
+        return result
+
+    def _finish(self, key: Hashable) -> int:
+        """Forget the call, returning how many callers joined it"""
+        # Calls made from now on send a new request rather than reuse this one
+        with self._lock:
+            del self._calls[key]
+            return self._joined.pop(key)
@@ -1,14 +1,20 @@
 """
 Token utilities
 """
+import base64
+import hashlib
 import json
 from datetime import datetime
-
-import jwt
-from requests.models import CaseInsensitiveDict
+from time import time
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 from connman_cli.lib import log
+from connman_cli.lib.cache import prune_cache
 from connman_cli.lib.constants import AppPaths, CIS2Environments
+from connman_cli.lib.exceptions import InvalidTokenError
+
+JWKS_TTL = 24 * 60 * 60
+VERIFIED_ALGORITHMS = ["RS256", "RS384", "RS512", "PS256", "PS384", "PS512"]
 
 
 def parse_dict_cookies(cookies):
@@ -29,44 +35,193 @@ def parse_dict_cookies(cookies):
     return result
 
 
-def decode_token_from_headers(headers: CaseInsensitiveDict):
-    """Decode Connection Manager access token from the response headers"""
+def _decode_segment(segment: str) -> Dict[str, Any]:
+    """Decode a base64url encoded JSON segment of a JWT"""
+    padded = segment + "=" * (-len(segment) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+
+
+def decode_header(token: str) -> Dict[str, Any]:
+    """Decode the header of a JWT"""
+    try:
+        return _decode_segment(token.split(".", 1)[0])
+    except ValueError as exc:
+        raise InvalidTokenError("Could not decode the access token header") from exc
+
+
+def decode_claims(token: str) -> Dict[str, Any]:
+    """
+    Decode the claims of a JWT without verifying its signature
+
+    Avoids importing PyJWT and the cryptography backend on the hot path
+    """
+    try:
+        _, payload, _ = token.split(".")
+        claims = _decode_segment(payload)
+    except ValueError as exc:
+        raise InvalidTokenError("Could not decode the access token claims") from exc
+
+    if not isinstance(claims, dict):
+        raise InvalidTokenError("Access token claims are not a JSON object")
+
+    return claims
+
+
+def _jwks_cache_path(url: str):
+    digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return AppPaths.cache_dir / f"jwks-{digest}.json"
+
+
+def _get_cached_json(url: str, refresh: bool, ttl: int, what: str) -> dict:
+    """Get a JSON document, cached on disk for ttl seconds"""
+    path = _jwks_cache_path(url)
+
+    if not refresh and path.exists():
+        try:
+            cached = json.loads(path.read_text())
+            if time() - cached["fetched_at"] < ttl:
+                return cached["document"]
+        except (ValueError, KeyError):
+            pass
+
+    import requests  # pylint: disable=import-outside-toplevel
+
+    try:
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        document = response.json()
+    except (requests.RequestException, ValueError) as exc:
+        raise InvalidTokenError(f"Could not fetch {what} from {url}") from exc
+
+    if not isinstance(document, dict):
+        raise InvalidTokenError(f"Could not fetch {what} from {url}")
+
+    AppPaths.cache_dir.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"fetched_at": int(time()), "document": document}))
+
+    return document
+
+
+def get_jwks(jwks_url: str, refresh: bool = False, ttl: int = JWKS_TTL) -> dict:
+    """
+    Get a JSON Web Key Set, cached on disk for ttl seconds
+    """
+    return _get_cached_json(jwks_url, refresh, ttl, "signing keys")
+
+
+def get_jwks_uri(issuer: str, ttl: int = JWKS_TTL) -> str:
+    """
+    Discover the JWKS URI of an issuer from its OpenID Connect discovery
+    document, cached on disk for ttl seconds
+    """
+    issuer = issuer.rstrip("/")
+    discovery = _get_cached_json(
+        f"{issuer}/.well-known/openid-configuration", False, ttl, "issuer metadata"
+    )
+
+    if str(discovery.get("issuer", "")).rstrip("/") != issuer:
+        raise InvalidTokenError(f"Issuer metadata is not for {issuer}")
+
+    jwks_uri = discovery.get("jwks_uri")
+    if not isinstance(jwks_uri, str):
+        raise InvalidTokenError(f"Issuer metadata for {issuer} has no jwks_uri")
+
+    return jwks_uri
+
+
+def verify_token(
+    token: str, issuer: str, jwks_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Verify the issuer and signature of a JWT against the issuer's signing keys
+
+    The issuer is pinned by the caller, as the token's own iss claim cannot
+    be trusted until the signature is checked. Unless jwks_url is given, the
+    key set is found from the issuer's OpenID Connect discovery document.
+    The key set is fetched again only when the signing key is not cached, so
+    key rotation costs a single fetch.
+    """
+    import jwt  # pylint: disable=import-outside-toplevel
+
+    header = decode_header(token)
+    if header.get("alg") not in VERIFIED_ALGORITHMS:
+        raise InvalidTokenError(f"Unsupported token algorithm {header.get('alg')}")
+
+    issuer = issuer.rstrip("/")
+    token_issuer = decode_claims(token).get("iss")
+    if not isinstance(token_issuer, str):
+        raise InvalidTokenError("Access token has no issuer")
+
+    if token_issuer.rstrip("/") != issuer:
+        raise InvalidTokenError(
+            f"Access token issuer {token_issuer} does not match {issuer}"
+        )
+
+    jwks_url = jwks_url or get_jwks_uri(issuer)
+
+    def find_key(jwks: dict) -> Optional[dict]:
+        keys = jwks.get("keys", [])
+        for key in keys:
+            if key.get("kid") == header.get("kid"):
+                return key
+
+        return keys[0] if len(keys) == 1 and "kid" not in header else None
+
+    key = find_key(get_jwks(jwks_url)) or find_key(get_jwks(jwks_url, refresh=True))
+    if key is None:
+        raise InvalidTokenError(f"No signing key found for kid={header.get('kid')}")
+
+    try:
+        return jwt.decode(
+            token,
+            jwt.PyJWK(key).key,
+            algorithms=[header["alg"]],
+            options={"verify_aud": False},
+        )
+    except jwt.PyJWTError as exc:
+        raise InvalidTokenError(f"Access token is not valid: {exc}") from exc
+
+
+def decode_token_from_headers(headers: Mapping[str, str], issuer: Optional[str] = None):
+    """
+    Decode Connection Manager access token from the response headers
+
+    The issuer and signature are only checked if the expected issuer is given
+    """
     raw_session_cookie = headers.get("set-cookie")
-    session_cookie = parse_dict_cookies(raw_session_cookie)
+    session_cookie = parse_dict_cookies(raw_session_cookie or "")
 
-    token = session_cookie["__Host-session"]
+    token = session_cookie.get("__Host-session")
+    if not token:
+        raise InvalidTokenError("No __Host-session cookie in the response")
 
-    return token, jwt.decode(token, options={"verify_signature": False})
+    if issuer is None:
+        return token, decode_claims(token)
+
+    return token, verify_token(token, issuer)
 
 
 def get_cached_token(env: CIS2Environments, subject: str, silent: bool = False):
-    """Get a token from the cache"""
-    cached_tokens = []
+    """
+    Get a token from the cache
+
+    Expired tokens are skipped rather than removed, lookups never write to
+    the cache. Only the token with the latest expiry is read from disk.
+    """
+    now = time()
+    latest_expiry, latest_path = 0, None
 
     for path in AppPaths.cache_dir.glob(f"token-{env.value}-{subject}*.json"):
         timestamp = path.name.removesuffix(".json").split("-").pop()
+        if timestamp.isdigit() and int(timestamp) > max(now, latest_expiry):
+            latest_expiry, latest_path = int(timestamp), path
 
-        if datetime.now() > datetime.fromtimestamp(int(timestamp)):
-            path.unlink()
-            if not silent:
-                log.debug(
-                    f"Removed expired token [bold]{path.name}[/bold] from the cache"
-                )
-
-            continue
-
-        token = json.loads(path.read_text())
-        cached_tokens.append(token)
-
-    if len(cached_tokens) == 0:
+    if latest_path is None:
         if not silent:
             log.warn("No valid cached tokens are present. Please reauthenticate.")
         return None
 
-    sorted_tokens = sorted(
-        cached_tokens, key=lambda token: token["info"]["exp"], reverse=True
-    )
-    cached_token = sorted_tokens[0]
+    cached_token = json.loads(latest_path.read_text())
 
     if not silent:
         log.info(
@@ -90,3 +245,56 @@ def cache_token(raw_token: str, token_info: dict, env: CIS2Environments):
     cache_token_path.write_text(json.dumps({"token": raw_token, "info": token_info}))
 
     log.info(f"Saved temporary access token to [bold]{cache_token_path}[/bold]")
+
+    # Pruning on the write path keeps the cache bounded without slowing lookups
+    try:
+        pruned = prune_cache()
+    except (OSError, ValueError) as exc:
+        log.debug(f"Could not prune the cache: {exc}")
+        return
+
+    if pruned:
+        log.debug(f"Pruned [bold]{len(pruned)}[/bold] entries from the cache")
+
+
+class StaticTokenProvider:  # pylint: disable=too-few-public-methods
+    """Token provider that always returns the same access token"""
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def get_token(self, env: CIS2Environments, subject: str) -> Optional[str]:
+        """Get the access token"""
+        # pylint: disable=unused-argument
+        return self.token
+
+
+class CachedTokenProvider:
+    """
+    Token provider backed by the token cache
+
+    Tokens are read from disk once and held in memory until they expire
+    """
+
+    def __init__(self, silent: bool = True):
+        self.silent = silent
+        self._tokens: Dict[Tuple[str, str], dict] = {}
+
+    def get_token(self, env: CIS2Environments, subject: str) -> Optional[str]:
+        """Get an unexpired access token for the environment and subject"""
+        key = (env.value, subject)
+        cached_token = self._tokens.get(key)
+
+        if cached_token is None or cached_token["info"]["exp"] <= time():
+            cached_token = get_cached_token(env, subject, silent=self.silent)
+            if cached_token is None:
+                self._tokens.pop(key, None)
+                return None
+
+            self._tokens[key] = cached_token
+
+        return cached_token["token"]
+
+    def clear(self):
+        """Forget all tokens held in memory"""
+        self._tokens.clear()
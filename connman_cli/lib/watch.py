@@ -0,0 +1,168 @@
+"""
+Config watching
+
+Polls Connection Manager for config changes. Only the hash of each config
+is held between polls, and is sent as an If-None-Match ETag when a known
+config is fetched. Servers that honour it only send details for new and
+changed configs; otherwise every poll downloads every config, which is one
+request to list the configs and one more for each config.
+"""
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from connman_cli.lib import log
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import WatchEventType
+from connman_cli.lib.exceptions import APIError, TransportError
+
+
+@dataclass
+class WatchEvent:
+    """A config that was created, updated or deleted"""
+
+    event: WatchEventType
+    config_id: str
+    hash: Optional[str]
+    config: Optional[Dict[str, Any]] = None
+    timestamp: str = field(
+        default_factory=lambda: datetime.now(timezone.utc).isoformat()
+    )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Event as a JSON serialisable dictionary"""
+        return {
+            "event": self.event.value,
+            "config_id": self.config_id,
+            "hash": self.hash,
+            "config": self.config,
+            "timestamp": self.timestamp,
+        }
+
+
+MIN_INTERVAL = 1.0
+
+
+class AdaptiveInterval:
+    """
+    Poll interval that backs off while nothing changes
+
+    The interval grows by factor after every quiet poll, up to maximum,
+    and drops back to minimum as soon as a change is seen. Intervals
+    shorter than MIN_INTERVAL are raised to it, so a watch never busy-polls.
+    """
+
+    def __init__(self, minimum: float, maximum: float, factor: float = 2.0):
+        minimum = max(minimum, MIN_INTERVAL)
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.factor = factor
+        self.current = minimum
+
+    def changed(self):
+        """Poll again soon"""
+        self.current = self.minimum
+
+    def unchanged(self):
+        """Poll less often"""
+        self.current = min(self.current * self.factor, self.maximum)
+
+
+class ConfigWatcher:
+    """
+    Detects config changes in a team by comparing hashes between polls
+    """
+
+    def __init__(self, client: ConnmanClient, team_id: str):
+        self.client = client
+        self.team_id = team_id
+        self.hashes: Dict[str, str] = {}
+
+    def _fetch(self, config_id: str) -> Optional[Dict[str, Any]]:
+        known = self.hashes.get(config_id)
+
+        try:
+            if known is None:
+                return self.client.get_config(self.team_id, config_id)
+
+            return self.client.get_config_if_changed(self.team_id, config_id, known)
+        except APIError as exc:
+            # Deleted since it was listed, reported by the next poll
+            if exc.status_code == 404:
+                return None
+            raise
+
+    def poll(self) -> List[WatchEvent]:
+        """
+        List the team's configs and return the changes since the last poll
+
+        The hashes are only replaced once the whole poll succeeds, so a
+        failed poll leaves its changes to be reported by the next one
+        """
+        config_ids = self.client.list_configs(self.team_id)
+        hashes: Dict[str, str] = {}
+        events = []
+
+        for config_id in config_ids:
+            created = config_id not in self.hashes
+            config = self._fetch(config_id)
+            if config is None:
+                if not created:
+                    hashes[config_id] = self.hashes[config_id]
+                continue
+
+            hashes[config_id] = config["hash"]
+            event = WatchEventType.created if created else WatchEventType.updated
+            events.append(WatchEvent(event, config_id, config["hash"], config))
+
+        for config_id in set(self.hashes).difference(hashes):
+            events.append(
+                WatchEvent(WatchEventType.deleted, config_id, self.hashes[config_id])
+            )
+
+        self.hashes = hashes
+        return events
+
+    def run(
+        self,
+        emit: Callable[[WatchEvent], None],
+        interval: AdaptiveInterval,
+        initial: bool = False,
+        max_polls: Optional[int] = None,
+    ):
+        """
+        Poll until max_polls is reached, passing each change to emit
+
+        The first poll records the current configs, which are only emitted
+        as created events if initial is set. Connection failures and server
+        errors are logged and retried with the interval backed off.
+        """
+        polls = 0
+        baseline = not initial
+
+        while max_polls is None or polls < max_polls:
+            if polls:
+                time.sleep(interval.current)
+            polls += 1
+
+            try:
+                events = self.poll()
+            except (TransportError, APIError) as exc:
+                if isinstance(exc, APIError) and exc.status_code < 500:
+                    raise
+
+                interval.unchanged()
+                log.warn(f"{exc}, retrying in {interval.current:g}s")
+                continue
+
+            if baseline:
+                baseline, events = False, []
+
+            for event in events:
+                emit(event)
+
+            if events:
+                interval.changed()
+            else:
+                interval.unchanged()
@@ -1,10 +1,20 @@
 """
 Main application entrypoint
 """
-
-from connman_cli.app import app
+import os
 
 
 def main():
     """Entrypoint"""
+    # Profile names and config IDs are completed before typer is imported
+    instruction = os.environ.get("_CONNMAN_COMPLETE")
+    if instruction:
+        # pylint: disable=import-outside-toplevel
+        from connman_cli.lib.completion import fast_complete
+
+        if fast_complete(instruction):
+            return
+
+    from connman_cli.app import app  # pylint: disable=import-outside-toplevel
+
     app()
@@ -0,0 +1,118 @@
+"""
+Shared test fixtures
+"""
+# pylint: disable=redefined-outer-name
+import pytest
+from typer.testing import CliRunner
+
+from connman_cli.app import app
+from connman_cli.lib import api_client, log
+from connman_cli.lib import client as client_module
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import AppPaths, CIS2Environments
+from connman_cli.lib.token import cache_token
+from tests.stub_server import StubConnectionManager
+
+
+@pytest.fixture(autouse=True)
+def app_paths(tmp_path, monkeypatch):
+    """Keep config and cache files inside a temporary directory"""
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    config_file = config_dir / "config.ini"
+    config_file.touch()
+
+    monkeypatch.setattr(AppPaths, "config_dir", config_dir)
+    monkeypatch.setattr(AppPaths, "config_file", config_file)
+    monkeypatch.setattr(AppPaths, "cache_dir", tmp_path / "cache")
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.setenv("CONNMAN_SILENT", "True")
+    monkeypatch.setenv("CONNMAN_COLOUR", "False")
+    log.configure_from_env()
+
+    return AppPaths
+
+
+@pytest.fixture
+def make_stub():
+    """Start stub Connection Manager servers, stopped at teardown"""
+    stubs = []
+
+    def factory(**kwargs) -> StubConnectionManager:
+        stub = StubConnectionManager(**kwargs).start()
+        stubs.append(stub)
+        return stub
+
+    yield factory
+
+    for stub in stubs:
+        stub.stop()
+
+
+@pytest.fixture
+def stub(make_stub, request):
+    """
+    Stub Connection Manager server
+
+    The number of configs can be set with indirect parametrization
+    """
+    return make_stub(configs=getattr(request, "param", 0))
+
+
+@pytest.fixture
+def env_stubs(make_stub, monkeypatch, app_paths):
+    """
+    A stub server for each environment, with dep stopped, and a saved
+    profile for dev
+    """
+    stubs = {env: make_stub() for env in CIS2Environments}
+    stubs[CIS2Environments.dep].stop()
+    monkeypatch.setattr(
+        client_module, "get_base_api_endpoint", lambda env: stubs[env].url
+    )
+
+    app_paths.config_file.write_text(
+        "[connman.profile.stub]\n"
+        f"environment = dev\nsecret = {stubs[CIS2Environments.dev].secret}\n"
+    )
+
+    return stubs
+
+
+@pytest.fixture
+def cli(stub, monkeypatch):
+    """
+    Invoke the CLI in-process against the stub server
+
+    The shared API clients are reset before each invocation so that every
+    call behaves like a fresh process, excluding import time. stderr is
+    captured apart from stdout, so tests can check each stream.
+    """
+    monkeypatch.setattr(client_module, "get_base_api_endpoint", lambda _: stub.url)
+    try:
+        runner = CliRunner(mix_stderr=False)  # pylint: disable=unexpected-keyword-arg
+    except TypeError:
+        # Click 8.2 removed mix_stderr, and always captures stderr apart
+        runner = CliRunner()
+
+    def invoke(*args: str):
+        api_client.close_clients()
+        return runner.invoke(app, list(args), catch_exceptions=False)
+
+    yield invoke
+
+    api_client.close_clients()
+
+
+@pytest.fixture
+def authenticate(stub):
+    """Cache an access token for the stub team"""
+
+    def authenticate_stub(target: StubConnectionManager = stub):
+        with ConnmanClient(CIS2Environments.dev, base_url=target.url) as client:
+            result = client.auth(target.secret)
+
+        cache_token(result.token, result.info, CIS2Environments.dev)
+        return result
+
+    return authenticate_stub
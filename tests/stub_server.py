@@ -0,0 +1,520 @@
+"""
+Local stub of the CIS2 Connection Manager API
+
+Usage:
+
+    with StubConnectionManager(configs=100) as stub:
+        client = ConnmanClient("dev", base_url=stub.url)
+"""
+import base64
+import hashlib
+import json
+import socket
+import ssl
+import threading
+from email.message import Message
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import sleep, time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_TEAM_ID = "stub-team"
+DEFAULT_SECRET = "stub-secret"
+TOKEN_LIFETIME = 3600
+
+
+def _b64(data: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+
+
+def make_token(team_ids, lifetime: int = TOKEN_LIFETIME) -> str:
+    """Create an unsigned JWT with Connection Manager claims"""
+    now = int(time())
+    claims = {
+        "iss": "stub-connection-manager",
+        "sub": team_ids[0],
+        "aud": "connman",
+        "iat": now,
+        "exp": now + lifetime,
+        "team_ids": list(team_ids),
+    }
+
+    return f"{_b64({'alg': 'none', 'typ': 'JWT'})}.{_b64(claims)}."
+
+
+def read_token(token: str) -> Optional[Dict[str, Any]]:
+    """Read the claims of an unsigned JWT, if it has not expired"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+    except (IndexError, ValueError):
+        return None
+
+    if claims["exp"] <= time():
+        return None
+
+    return claims
+
+
+def config_hash(client_config: dict) -> str:
+    """Hash of a client config, used for optimistic locking on update"""
+    return hashlib.sha256(
+        json.dumps(client_config, sort_keys=True).encode()
+    ).hexdigest()
+
+
+def make_client_config(config_id: str) -> Dict[str, Any]:
+    """Create a client config"""
+    return {
+        "client_name": config_id,
+        "description": f"Stub client {config_id}",
+        "redirect_uris": [f"https://{config_id}.example.com/callback"],
+        "backchannel_logout_uri": f"https://{config_id}.example.com/logout",
+        "jwks_uri": f"https://{config_id}.example.com/jwks.json",
+        "jwks_uri_signing_algorithm": "RS256",
+    }
+
+
+class _Routes:
+    """
+    Connection Manager API routes, shared by the HTTP/1.1 and HTTP/2 servers
+
+    Subclasses provide the request path, headers and body, and send responses
+    """
+
+    path: str
+    headers: Message
+    server: Any
+
+    def _send(self, status: int, body: Any = None, headers: Tuple = ()):
+        raise NotImplementedError
+
+    def _body(self) -> Optional[dict]:
+        raise NotImplementedError
+
+    def _route(self):
+        """Split the path into (parts, query) and count the request"""
+        self.server.stub.record_request()
+        if self.server.stub.latency:
+            sleep(self.server.stub.latency)
+
+        url = urlsplit(self.path)
+        return url.path.strip("/").split("/"), parse_qs(url.query)
+
+    def _authorise(self, team_id: str) -> bool:
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        session = cookie.get("__Host-session")
+        claims = read_token(session.value) if session else None
+
+        if claims is None:
+            self._send(401, {"message": "Unauthorised"})
+            return False
+
+        if team_id not in claims["team_ids"]:
+            self._send(403, {"message": "Forbidden"})
+            return False
+
+        return True
+
+    def do_GET(self):  # pylint: disable=invalid-name,too-many-return-statements
+        """Handle GET requests"""
+        parts, _ = self._route()
+        stub = self.server.stub
+
+        if stub.take_failure("/".join(parts)):
+            return self._send(500, {"message": "Internal Server Error"})
+
+        if parts == ["api", "hello_world"]:
+            return self._send(200, {"message": "Hello World"})
+
+        if parts == [".well-known", "openid-configuration"]:
+            return self._send(
+                200, {"issuer": stub.url, "jwks_uri": f"{stub.url}/oauth2/jwks"}
+            )
+
+        if parts == ["oauth2", "jwks"]:
+            with stub.lock:
+                return self._send(200, stub.jwks)
+
+        if len(parts) in (3, 4) and parts[:2] == ["api", "configs"]:
+            if not self._authorise(parts[2]):
+                return None
+
+            with stub.lock:
+                configs = stub.teams.get(parts[2], {})
+                if len(parts) == 3:
+                    return self._send(200, {"configs": list(configs)})
+
+                if parts[3] not in configs:
+                    return self._send(404, {"message": "Not Found"})
+
+                config = configs[parts[3]]
+                etag = f'"{config["hash"]}"'
+                if self.headers.get("If-None-Match") == etag:
+                    return self._send(304, headers=(("ETag", etag),))
+
+                return self._send(200, config, headers=(("ETag", etag),))
+
+        return self._send(404, {"message": "Not Found"})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Handle POST requests"""
+        parts, _ = self._route()
+        stub = self.server.stub
+
+        if parts == ["api", "auth"]:
+            scheme, _, secret = self.headers.get("Authorization", "").partition(" ")
+            team_ids = stub.secrets.get(secret)
+            if scheme != "SecretAuth" or team_ids is None:
+                return self._send(401, {"message": "Unauthorised"})
+
+            token = make_token(team_ids)
+            cookie = f"__Host-session={token}; Path=/; Secure; HttpOnly"
+            return self._send(200, {}, headers=(("Set-Cookie", cookie),))
+
+        if len(parts) == 3 and parts[:2] == ["api", "configs"]:
+            if not self._authorise(parts[2]):
+                return None
+
+            client_config = self._body() or {}
+            config_id = client_config.get("client_name", "")
+
+            with stub.lock:
+                configs = stub.teams.setdefault(parts[2], {})
+                if config_id in configs:
+                    return self._send(409, {"message": "Conflict"})
+
+                configs[config_id] = stub.make_entry(client_config)
+
+            return self._send(201, {"config_name": config_id, **configs[config_id]})
+
+        return self._send(404, {"message": "Not Found"})
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """Handle PUT requests"""
+        parts, query = self._route()
+        stub = self.server.stub
+
+        if len(parts) == 4 and parts[:2] == ["api", "configs"]:
+            if not self._authorise(parts[2]):
+                return None
+
+            client_config = self._body() or {}
+
+            with stub.lock:
+                configs = stub.teams.get(parts[2], {})
+                if parts[3] not in configs:
+                    return self._send(404, {"message": "Not Found"})
+
+                if query.get("hash", [None])[0] != configs[parts[3]]["hash"]:
+                    return self._send(409, {"message": "Hash mismatch"})
+
+                configs[parts[3]] = stub.make_entry(client_config)
+
+            return self._send(200, configs[parts[3]])
+
+        return self._send(404, {"message": "Not Found"})
+
+
+class _Handler(_Routes, BaseHTTPRequestHandler):
+    """HTTP/1.1 request handler for the stub server"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, avoid delayed ACK stalls
+    disable_nagle_algorithm = True
+    server: "_Server"
+
+    def log_message(self, *_):  # pylint: disable=arguments-differ
+        pass
+
+    def _send(self, status: int, body: Any = None, headers: Tuple = ()):
+        data = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Optional[dict]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return None
+
+        return json.loads(self.rfile.read(length))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        stub: "StubConnectionManager",
+        server_address: Tuple[str, int],
+        handler: type,
+    ):
+        super().__init__(server_address, handler)
+        self.stub = stub
+
+    def process_request(self, request, client_address):
+        self.stub.record_connection()
+        super().process_request(request, client_address)
+
+
+class _H2Request(_Routes):
+    """A request received on an HTTP/2 stream"""
+
+    def __init__(self, server: Any, headers: List[Tuple[str, str]], body: bytes):
+        self.server = server
+        self.headers = Message()
+        for key, value in headers:
+            if key.startswith(":"):
+                continue
+            self.headers[key] = value
+
+        pseudo = dict(headers)
+        self.method = pseudo[":method"]
+        self.path = pseudo[":path"]
+        self.body = body
+        self.response: Tuple[int, Tuple, bytes] = (500, (), b"")
+
+    def _send(self, status: int, body: Any = None, headers: Tuple = ()):
+        data = json.dumps(body).encode() if body is not None else b""
+        headers = (*headers, ("content-type", "application/json"))
+        self.response = (status, (*headers, ("content-length", str(len(data)))), data)
+
+    def _body(self) -> Optional[dict]:
+        return json.loads(self.body) if self.body else None
+
+    def handle(self) -> Tuple[int, Tuple, bytes]:
+        """Route the request and return the response"""
+        handler = getattr(self, f"do_{self.method}", None)
+        if handler is None:
+            self._send(405, {"message": "Method Not Allowed"})
+        else:
+            handler()
+
+        return self.response
+
+
+class _H2Server:
+    """
+    Cleartext HTTP/2 server, for clients with prior knowledge of HTTP/2
+
+    Each connection is read on its own thread, and each request stream is
+    handled on another, so slow requests do not block others on the same
+    connection.
+    """
+
+    def __init__(self, stub: "StubConnectionManager", server_address: Tuple[str, int]):
+        self.socket = socket.create_server(server_address)
+        self.server_address = self.socket.getsockname()
+        self.stub = stub
+        self._running = threading.Event()
+
+    def serve_forever(self):
+        """Accept connections until shutdown"""
+        self._running.set()
+        while self._running.is_set():
+            try:
+                connection, _ = self.socket.accept()
+            except OSError:
+                break
+
+            self.stub.record_connection()
+            threading.Thread(
+                target=self._serve_connection, args=(connection,), daemon=True
+            ).start()
+
+    def _serve_connection(self, sock: socket.socket):
+        # pylint: disable=import-outside-toplevel,too-many-locals
+        from h2.config import H2Configuration
+        from h2.connection import H2Connection
+        from h2.events import (
+            ConnectionTerminated,
+            DataReceived,
+            RequestReceived,
+            StreamEnded,
+        )
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = H2Connection(
+            H2Configuration(client_side=False, header_encoding="utf-8")
+        )
+        lock = threading.Lock()
+        streams: Dict[int, Tuple[List, bytearray]] = {}
+
+        def respond(stream_id: int, request: _H2Request):
+            status, headers, data = request.handle()
+            with lock:
+                connection.send_headers(
+                    stream_id, [(":status", str(status)), *headers], end_stream=not data
+                )
+                if data:
+                    connection.send_data(stream_id, data, end_stream=True)
+                sock.sendall(connection.data_to_send())
+
+        with lock:
+            connection.initiate_connection()
+            sock.sendall(connection.data_to_send())
+
+        with sock:
+            while self._running.is_set():
+                try:
+                    data = sock.recv(65535)
+                except OSError:
+                    return
+                if not data:
+                    return
+
+                with lock:
+                    events = connection.receive_data(data)
+                    for event in events:
+                        if isinstance(event, RequestReceived):
+                            streams[event.stream_id] = (event.headers, bytearray())
+                        elif isinstance(event, DataReceived):
+                            streams[event.stream_id][1].extend(event.data)
+                            connection.acknowledge_received_data(
+                                event.flow_controlled_length, event.stream_id
+                            )
+                        elif isinstance(event, StreamEnded):
+                            headers, body = streams.pop(event.stream_id)
+                            request = _H2Request(self, headers, bytes(body))
+                            threading.Thread(
+                                target=respond,
+                                args=(event.stream_id, request),
+                                daemon=True,
+                            ).start()
+                        elif isinstance(event, ConnectionTerminated):
+                            return
+
+                    sock.sendall(connection.data_to_send())
+
+    def shutdown(self):
+        """Stop accepting connections"""
+        self._running.clear()
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def server_close(self):
+        """Close the listening socket"""
+        self.socket.close()
+
+
+class StubConnectionManager:  # pylint: disable=too-many-instance-attributes
+    """
+    In-process Connection Manager API stub served over HTTP on localhost
+
+    Tokens are unsigned JWTs returned in a __Host-session cookie, and
+    config updates must provide the current hash of the config. Signing
+    keys set on jwks are served from the jwks_uri of the discovery document
+    at /.well-known/openid-configuration. GET requests for a path passed to
+    fail are answered with a 500 response. Every response is delayed by
+    latency seconds, to simulate a remote server.
+    With http2 set, requests are served over cleartext HTTP/2 instead,
+    which needs the h2 package. With an ssl_context, HTTP/1.1 requests are
+    served over TLS.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        configs: int = 0,
+        team_id: str = DEFAULT_TEAM_ID,
+        secret: str = DEFAULT_SECRET,
+        latency: float = 0.0,
+        http2: bool = False,
+        ssl_context: Optional[ssl.SSLContext] = None,
+    ):
+        self.team_id = team_id
+        self.secret = secret
+        self.secrets = {secret: [team_id]}
+        self.teams: Dict[str, Dict[str, dict]] = {team_id: {}}
+        self.lock = threading.Lock()
+        self.jwks: Dict[str, Any] = {"keys": []}
+        self.failures: Dict[str, int] = {}
+        self.request_count = 0
+        self.connection_count = 0
+        self.latency = latency
+
+        for index in range(configs):
+            self.add_config(f"config-{index:05d}")
+
+        self._server: Any = (
+            _H2Server(self, ("127.0.0.1", 0))
+            if http2
+            else _Server(self, ("127.0.0.1", 0), _Handler)
+        )
+        self.scheme = "http"
+        if ssl_context is not None:
+            self._server.socket = ssl_context.wrap_socket(
+                self._server.socket, server_side=True
+            )
+            self.scheme = "https"
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the stub"""
+        host, port = self._server.server_address[:2]
+        return f"{self.scheme}://{host}:{port}"
+
+    @staticmethod
+    def make_entry(client_config: dict) -> Dict[str, Any]:
+        """Create a stored config entry"""
+        return {"client_config": client_config, "hash": config_hash(client_config)}
+
+    def add_config(self, config_id: str, team_id: Optional[str] = None):
+        """Add a config directly to the stub"""
+        with self.lock:
+            self.teams.setdefault(team_id or self.team_id, {})[
+                config_id
+            ] = self.make_entry(make_client_config(config_id))
+
+    def fail(self, path: str, times: int = 1):
+        """Answer the next GET requests for a path with a 500 response"""
+        with self.lock:
+            self.failures[path.strip("/")] = times
+
+    def take_failure(self, path: str) -> bool:
+        """Whether a GET request for a path should fail"""
+        with self.lock:
+            if not self.failures.get(path):
+                return False
+
+            self.failures[path] -= 1
+            return True
+
+    def record_request(self):
+        """Count a request"""
+        with self.lock:
+            self.request_count += 1
+
+    def record_connection(self):
+        """Count a new client connection"""
+        with self.lock:
+            self.connection_count += 1
+
+    def start(self) -> "StubConnectionManager":
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving requests"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_):
+        self.stop()
@@ -0,0 +1,110 @@
+"""
+Tests for the global options of the app callback
+"""
+import json
+
+from connman_cli.lib import api_client, log
+from connman_cli.lib.constants import LogFormat, LogLevel
+
+
+def test_log_flags_override_env(cli, monkeypatch):
+    """Log flags take precedence over their environment variables"""
+    monkeypatch.setenv("CONNMAN_SILENT", "False")
+    monkeypatch.setenv("CONNMAN_LOG_FORMAT", "json")
+
+    from_env = cli("ping", "--env", "dev")
+    assert from_env.exit_code == 0
+    assert json.loads(from_env.stderr.splitlines()[0])["level"] == "info"
+
+    from_flag = cli("--log-format", "text", "ping", "--env", "dev")
+    assert from_flag.exit_code == 0
+    assert "Sending request to endpoint=/api/hello_world" in from_flag.stdout
+    assert from_flag.stderr == ""
+
+    quiet = cli("--quiet", "ping", "--env", "dev")
+    assert (quiet.stdout, quiet.stderr) == ("", "")
+
+
+def test_json_log_format(cli, stub, monkeypatch):
+    """--log-format json writes log records to stderr as JSON lines"""
+    monkeypatch.setenv("CONNMAN_SILENT", "False")
+
+    result = cli("--log-format", "json", "ping", "--env", "dev")
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stderr.splitlines()]
+    assert records[0]["level"] == "info"
+    assert records[0]["message"] == "Sending request to endpoint=/api/hello_world"
+    assert stub.request_count == 1
+
+    quiet = cli("--quiet", "--log-format", "json", "ping", "--env", "dev")
+    assert (quiet.stdout, quiet.stderr) == ("", "")
+
+
+def test_json_log_strips_only_markup(capsys):
+    """Rich styles are removed from JSON messages, other bracketed text is kept"""
+    log.configure(level=LogLevel.info, log_format=LogFormat.json)
+
+    log.info("Profile [bold]dev[/bold] in [dev] is [not found], [/]see [1, 2]")
+
+    record = json.loads(capsys.readouterr().err)
+    assert record["message"] == "Profile dev in [dev] is [not found], see [1, 2]"
+
+
+def test_api_error_details_logged_as_warning(cli, stub, authenticate, monkeypatch):
+    """Response details of API errors are kept at --log-level warning"""
+    monkeypatch.setenv("CONNMAN_SILENT", "False")
+    authenticate()
+    args = ["config", "get", "missing", "--env", "dev", "--team-id", stub.team_id]
+
+    result = cli("--log-level", "warning", "--log-format", "json", *args)
+
+    assert result.exit_code == 1
+    records = [json.loads(line) for line in result.stderr.splitlines()]
+    assert [record["level"] for record in records] == ["warning"]
+    assert records[0]["details"]["Status Code"] == 404
+
+    text = cli("--log-level", "warning", *args)
+
+    assert text.exit_code == 1
+    assert '"Status Code": 404' in text.stdout
+
+
+def test_api_error_details_are_redacted(cli, stub, authenticate, monkeypatch):
+    """Session tokens and secrets are not written to the logged details"""
+    monkeypatch.setenv("CONNMAN_SILENT", "False")
+    token = authenticate().token
+
+    result = cli(
+        *("--log-format", "json", "config", "get", "missing"),
+        *("--env", "dev", "--team-id", stub.team_id),
+    )
+
+    assert result.exit_code == 1
+    assert token not in result.stderr
+    details = json.loads(result.stderr.splitlines()[-1])["details"]
+    assert details["Request Headers"]["Cookie"] == "__Host-session=REDACTED"
+
+    failed = cli(
+        "--log-format", "json", "auth", "login", "--env", "dev", "--secret", "wrong"
+    )
+
+    assert failed.exit_code == 1
+    assert "wrong" not in failed.stderr
+    assert "SecretAuth REDACTED" in failed.stderr
+
+
+def test_transport_flags_do_not_leak(cli, stub, tmp_path):
+    """--record only applies to the invocation it is given to"""
+    cassette = tmp_path / "cassette.json"
+
+    recorded = cli("--record", str(cassette), "ping", "--env", "dev")
+    assert recorded.exit_code == 0
+    assert cassette.exists()
+    cassette.unlink()
+
+    plain = cli("ping", "--env", "dev")
+    assert plain.exit_code == 0
+    assert not cassette.exists()
+    assert api_client.get_transport() is None
+    assert stub.request_count == 2
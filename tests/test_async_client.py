@@ -0,0 +1,140 @@
+"""
+Tests for the asyncio client against the local stub server
+"""
+import asyncio
+
+import pytest
+
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import APIError
+from connman_cli.lib.token import StaticTokenProvider
+
+httpx = pytest.importorskip("httpx")
+
+# pylint: disable=wrong-import-position
+from connman_cli.lib.async_client import AsyncConnmanClient
+
+
+class CountingClient:
+    """httpx.AsyncClient wrapper recording the most requests in flight at once"""
+
+    def __init__(self):
+        self.client = httpx.AsyncClient()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def request(self, *args, **kwargs):
+        """Send a request, counting it while it is in flight"""
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return await self.client.request(*args, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    async def aclose(self):
+        """Close the wrapped client"""
+        await self.client.aclose()
+
+
+def make_client(stub, **kwargs) -> AsyncConnmanClient:
+    """Async client for the stub server"""
+    return AsyncConnmanClient(CIS2Environments.dev, base_url=stub.url, **kwargs)
+
+
+def test_ping(stub):
+    """Ping returns the decoded response body"""
+
+    async def run():
+        async with make_client(stub) as client:
+            return await client.ping()
+
+    assert asyncio.run(run()) == {"message": "Hello World"}
+
+
+@pytest.mark.parametrize("stub", [3], indirect=True)
+def test_auth_use_token(stub):
+    """With use_token the token from auth is sent with later requests"""
+
+    async def run():
+        async with make_client(stub) as client:
+            result = await client.auth(stub.secret, use_token=True)
+            return client, result, await client.list_configs(stub.team_id)
+
+    client, result, config_ids = asyncio.run(run())
+
+    assert isinstance(client.token_provider, StaticTokenProvider)
+    assert result.env == CIS2Environments.dev
+    assert result.info["team_ids"] == [stub.team_id]
+    assert config_ids == ["config-00000", "config-00001", "config-00002"]
+
+
+def test_get_configs_max_concurrency(make_stub):
+    """get_configs fetches every config, with max_concurrency requests at most"""
+    stub = make_stub(configs=20, latency=0.01)
+    counting = CountingClient()
+
+    async def run():
+        async with make_client(stub, client=counting, max_concurrency=4) as client:
+            await client.auth(stub.secret, use_token=True)
+            config_ids = await client.list_configs(stub.team_id)
+            return await client.get_configs(stub.team_id, config_ids)
+
+    configs = asyncio.run(run())
+
+    assert list(configs) == [f"config-{index:05d}" for index in range(20)]
+    assert configs["config-00007"] == stub.teams[stub.team_id]["config-00007"]
+    assert counting.max_in_flight == 4
+
+
+def test_create_and_update_config(stub):
+    """A created config can be updated with its hash"""
+
+    async def run():
+        async with make_client(stub) as client:
+            await client.auth(stub.secret, use_token=True)
+            created = await client.create_config(
+                stub.team_id,
+                "created",
+                ["https://created.example.com/callback"],
+                "https://created.example.com/logout",
+                "https://created.example.com/jwks.json",
+                "RS256",
+                description="Created",
+            )
+
+            config = {**created["client_config"], "description": "Updated"}
+            updated = await client.update_config(
+                stub.team_id, "created", config, created["hash"]
+            )
+            return created, updated
+
+    created, updated = asyncio.run(run())
+
+    assert created["config_name"] == "created"
+    assert created["client_config"]["description"] == "Created"
+    assert updated["client_config"]["description"] == "Updated"
+    assert stub.teams[stub.team_id]["created"] == updated
+
+
+@pytest.mark.parametrize("stub", [1], indirect=True)
+def test_api_error(stub):
+    """Unsuccessful responses raise APIError with the status code"""
+
+    async def run():
+        async with make_client(stub) as client:
+            await client.auth(stub.secret, use_token=True)
+            with pytest.raises(APIError) as missing:
+                await client.get_config(stub.team_id, "missing")
+
+            with pytest.raises(APIError) as stale:
+                await client.update_config(stub.team_id, "config-00000", {}, "stale")
+
+            return missing.value, stale.value
+
+    missing, stale = asyncio.run(run())
+
+    assert missing.status_code == 404
+    assert missing.endpoint == f"/api/configs/{stub.team_id}/missing"
+    assert stale.status_code == 409
+    assert stale.details()["Response Body"] == '{"message": "Hash mismatch"}'
@@ -0,0 +1,32 @@
+"""
+Tests for the auth commands
+"""
+import configparser
+
+
+def test_login_replay_keeps_cached_token(cli, stub, app_paths, tmp_path):
+    """A replayed login does not cache its redacted token or select the profile"""
+    app_paths.config_file.write_text(
+        f"[connman.profile.stub]\nenvironment = dev\nsecret = {stub.secret}\n"
+    )
+    cassette = tmp_path / "cassette.json"
+
+    recorded = cli("--record", str(cassette), "auth", "login", "--profile", "stub")
+
+    assert recorded.exit_code == 0
+    cached = {path: path.read_text() for path in app_paths.cache_dir.iterdir()}
+    config = app_paths.config_file.read_text()
+    assert "authtime" in config
+
+    for args in (["--profile", "stub"], ["--env", "dev", "--secret", stub.secret]):
+        replayed = cli("--replay", str(cassette), "auth", "login", *args)
+
+        assert replayed.exit_code == 0
+        assert {
+            path: path.read_text() for path in app_paths.cache_dir.iterdir()
+        } == cached
+        assert app_paths.config_file.read_text() == config
+
+    parser = configparser.ConfigParser()
+    parser.read(app_paths.config_file)
+    assert parser["connman.profile"]["selected"] == "connman.profile.stub"
@@ -0,0 +1,115 @@
+"""
+Tests for the bench command
+"""
+import json
+
+import pytest
+
+from connman_cli.lib.bench import percentile
+from connman_cli.lib.http2 import HTTP2Adapter
+
+
+@pytest.mark.parametrize(
+    "values,pct,expected",
+    [
+        ([], 50, 0.0),
+        ([1.0], 99, 1.0),
+        ([1.0, 2.0, 3.0, 4.0], 0, 1.0),
+        ([1.0, 2.0, 3.0, 4.0], 50, 2.0),
+        ([1.0, 2.0, 3.0, 4.0], 51, 3.0),
+        ([1.0, 2.0, 3.0, 4.0], 100, 4.0),
+        ([float(value) for value in range(1, 101)], 95, 95.0),
+    ],
+)
+def test_percentile(values, pct, expected):
+    """Nearest-rank percentiles, clamped to the first and last values"""
+    assert percentile(values, pct) == expected
+
+
+def test_bench_ping(cli, stub):
+    """Every request sent during the run is counted in the JSON summary"""
+    result = cli(
+        *("bench", "ping", "--env", "dev", "--base-url", stub.url),
+        *("--concurrency", "2", "--duration", "0.2", "--json"),
+    )
+
+    assert result.exit_code == 0
+    summary = json.loads(result.stdout)
+    assert summary["workload"] == "ping"
+    assert summary["concurrency"] == 2
+    assert summary["errors"] == 0
+    assert summary["requests"] == stub.request_count > 0
+    assert summary["latency_ms"]["p50"] <= summary["latency_ms"]["max"]
+
+
+def test_bench_errors(cli, stub, authenticate):
+    """Failed requests are counted as errors and the command exits with 1"""
+    authenticate()
+    before = stub.request_count
+
+    result = cli(
+        *("bench", "get", "--env", "dev", "--team-id", stub.team_id),
+        *("--base-url", stub.url, "--config-id", "missing"),
+        *("--duration", "0.2", "--json"),
+    )
+
+    assert result.exit_code == 1
+    summary = json.loads(result.stdout)
+    assert summary["errors"] == summary["requests"] == stub.request_count - before
+    assert summary["throughput_rps"] == 0.0
+
+
+def test_bench_record_and_replay(cli, stub, tmp_path):
+    """Bench clients use the --record and --replay transports"""
+    cassette = tmp_path / "cassette.json"
+    args = ["bench", "ping", "--env", "dev", "--base-url", stub.url]
+    args += ["--duration", "0.1", "--json"]
+
+    recorded = cli("--record", str(cassette), *args)
+
+    assert recorded.exit_code == 0
+    assert cassette.exists()
+
+    sent = stub.request_count
+    stub.stop()
+    replayed = cli("--replay", str(cassette), *args)
+
+    assert replayed.exit_code == 0
+    summary = json.loads(replayed.stdout)
+    assert summary["requests"] > 0
+    assert summary["errors"] == 0
+    assert stub.request_count == sent
+
+
+def test_bench_replay_missing_cassette(cli, stub, tmp_path):
+    """A missing cassette is an error, rather than a run against the network"""
+    result = cli(
+        *("--replay", str(tmp_path / "missing.json")),
+        *("bench", "ping", "--env", "dev", "--base-url", stub.url, "--duration", "0.1"),
+    )
+
+    assert result.exit_code == 1
+    assert stub.request_count == 0
+
+
+def test_bench_http2(cli, stub, monkeypatch):
+    """Bench clients send their requests through the --http2 transport"""
+    pytest.importorskip("h2")
+    sent = []
+    send = HTTP2Adapter.send
+
+    def counting_send(self, request, **kwargs):
+        sent.append(request.url)
+        return send(self, request, **kwargs)
+
+    monkeypatch.setattr(HTTP2Adapter, "send", counting_send)
+
+    result = cli(
+        *("--http2", "bench", "ping", "--env", "dev", "--base-url", stub.url),
+        *("--duration", "0.1", "--json"),
+    )
+
+    assert result.exit_code == 0
+    summary = json.loads(result.stdout)
+    assert summary["errors"] == 0
+    assert len(sent) == summary["requests"] == stub.request_count > 0
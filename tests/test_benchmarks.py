@@ -0,0 +1,275 @@
+"""
+Benchmarks for the CLI hot paths against the local stub server
+
+Compare runs with: pytest --benchmark-autosave, then pytest --benchmark-compare
+"""
+import json
+import os
+import subprocess
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from time import time
+
+import pytest
+
+from connman_cli.lib import log
+from connman_cli.lib.cache import prune_cache
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.http2 import HTTP2Adapter
+from connman_cli.lib.token import get_cached_token
+from connman_cli.lib.watch import ConfigWatcher
+
+
+def test_cli_startup(benchmark, tmp_path):
+    """Time to import the application and render --help in a new process"""
+    env = {**os.environ, "HOME": str(tmp_path)}
+    command = [sys.executable, "-c", "from connman_cli.main import main; main()"]
+
+    def run():
+        return subprocess.run(
+            [*command, "--help"], env=env, capture_output=True, check=True
+        )
+
+    result = benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+    assert b"Usage" in result.stdout
+
+
+COMPLETION_SCRIPT = """
+import sys
+sys.argv[0] = "connman"
+from connman_cli.main import main
+try:
+    main()
+finally:
+    modules = ("typer", "click", "rich", "requests", "jwt")
+    sys.stderr.write(" ".join(m for m in modules if m in sys.modules))
+"""
+
+# Completion runs on every tab press, so the interpreter start and lookup
+# must stay well below the delay a user would notice
+COMPLETION_BUDGET = 0.1
+
+
+def test_shell_completion(benchmark, tmp_path):
+    """Completing config IDs from the local cache in a new process"""
+    cache_dir = tmp_path / ".cache" / "connman-cli"
+    cache_dir.mkdir(parents=True)
+    cache = cache_dir / "config-ids-dev-stub-team.json"
+    cache.write_text(json.dumps(["config-00000", "config-00001", "other"]))
+
+    env = {
+        **os.environ,
+        "HOME": str(tmp_path),
+        "_CONNMAN_COMPLETE": "complete_bash",
+        "COMP_WORDS": "connman config get --env dev --team-id stub-team config",
+        "COMP_CWORD": "7",
+    }
+
+    def run():
+        return subprocess.run(
+            [sys.executable, "-c", COMPLETION_SCRIPT],
+            env=env,
+            capture_output=True,
+            check=False,
+        )
+
+    result = benchmark.pedantic(run, rounds=5, iterations=1, warmup_rounds=1)
+
+    assert result.stdout.split() == [b"config-00000", b"config-00001"]
+    assert result.stderr == b"", "completion should not import typer or requests"
+    if not benchmark.disabled:
+        assert benchmark.stats.stats.median < COMPLETION_BUDGET
+
+
+def test_auth_login(benchmark, cli, stub):
+    """Secret authentication, token decoding and token caching"""
+    result = benchmark(cli, "auth", "login", "--env", "dev", "--secret", stub.secret)
+    assert result.exit_code == 0
+
+
+def test_cached_token_lookup(benchmark, app_paths):
+    """Finding the valid token among many expired ones, without removing any"""
+    app_paths.cache_dir.mkdir()
+    now = int(time())
+    for expires in [*range(now - 1000, now), now + 3600]:
+        path = app_paths.cache_dir / f"token-dev-subject-{expires}.json"
+        path.write_text(json.dumps({"token": "token", "info": {"exp": expires}}))
+
+    cached = benchmark(get_cached_token, CIS2Environments.dev, "subject", True)
+
+    assert cached["info"]["exp"] == now + 3600
+    assert len(list(app_paths.cache_dir.iterdir())) == 1001
+    assert len(prune_cache()) == 1000
+
+
+@pytest.mark.parametrize("stub", [10, 100, 1000], indirect=True)
+def test_config_list_with_detail(benchmark, cli, stub, authenticate):
+    """Listing every config in a team with details"""
+    authenticate()
+    args = ["config", "list", "--with-detail", "--env", "dev"]
+
+    result = benchmark.pedantic(
+        cli, args=(*args, "--team-id", stub.team_id), rounds=3, iterations=1
+    )
+
+    assert result.exit_code == 0
+    assert len(json.loads(result.stdout)) == len(stub.teams[stub.team_id])
+
+
+@pytest.mark.parametrize("stub", [1], indirect=True)
+def test_config_edit(benchmark, cli, stub, authenticate):
+    """Reading a config and saving a modified copy with its hash"""
+    authenticate()
+    revisions = count()
+
+    def edit():
+        return cli(
+            "config",
+            "edit",
+            "config-00000",
+            "--description",
+            f"Revision {next(revisions)}",
+            "--env",
+            "dev",
+            "--team-id",
+            stub.team_id,
+        )
+
+    result = benchmark(edit)
+
+    assert result.exit_code == 0
+    client_config = stub.teams[stub.team_id]["config-00000"]["client_config"]
+    assert client_config["description"] == f"Revision {next(revisions) - 1}"
+
+
+@pytest.mark.parametrize("stub", [100], indirect=True)
+def test_config_list_with_detail_replay(benchmark, cli, stub, authenticate, tmp_path):
+    """Listing configs from a cassette, measuring client-side overhead only"""
+    token = authenticate().token
+    cassette = tmp_path / "cassette.json"
+    args = ["config", "list", "--with-detail", "--env", "dev"]
+    args += ["--team-id", stub.team_id]
+
+    recorded = cli("--record", str(cassette), *args)
+    stub.stop()
+
+    assert recorded.exit_code == 0
+    assert token not in cassette.read_text()
+
+    result = benchmark(cli, "--replay", str(cassette), *args)
+
+    assert result.exit_code == 0
+    assert result.stdout == recorded.stdout
+
+
+@pytest.mark.parametrize("stub", [100], indirect=True)
+def test_config_watch_poll(benchmark, stub, authenticate):
+    """A watch poll where nothing has changed, answered with 304 responses"""
+    authenticate()
+
+    with ConnmanClient(CIS2Environments.dev, base_url=stub.url) as client:
+        watcher = ConfigWatcher(client, stub.team_id)
+        assert len(watcher.poll()) == 100
+
+        assert benchmark(watcher.poll) == []
+
+        stub.add_config("config-new")
+        edited = stub.make_entry({"client_name": "edited"})
+        with stub.lock:
+            stub.teams[stub.team_id]["config-00001"] = edited
+            del stub.teams[stub.team_id]["config-00002"]
+
+        events = {event.config_id: event for event in watcher.poll()}
+
+    assert {key: event.event.value for key, event in events.items()} == {
+        "config-new": "created",
+        "config-00001": "updated",
+        "config-00002": "deleted",
+    }
+    assert events["config-00001"].hash == edited["hash"]
+    assert len(watcher.hashes) == 100
+
+
+def test_ping_all(benchmark, cli, env_stubs):
+    """Health check of every environment, with profile authentication"""
+    result = benchmark(cli, "ping", "--all", "--auth")
+
+    assert result.exit_code == 1
+    assert len(json.loads(result.stdout)) == len(env_stubs) + 1
+
+
+@pytest.mark.parametrize("threads", [16])
+def test_concurrent_identical_gets(benchmark, make_stub, authenticate, threads):
+    """Concurrent reads of one config share a single in-flight request"""
+    stub = make_stub(configs=1, latency=0.05)
+    authenticate(stub)
+
+    with ConnmanClient(CIS2Environments.dev, base_url=stub.url) as client:
+
+        def fetch_all():
+            barrier = threading.Barrier(threads)
+            before = stub.request_count
+
+            def fetch(_):
+                barrier.wait()
+                return client.get_config(stub.team_id, "config-00000")
+
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                configs = list(executor.map(fetch, range(threads)))
+
+            return stub.request_count - before, configs
+
+        requests, configs = benchmark.pedantic(fetch_all, rounds=3, iterations=1)
+
+    assert requests == 1
+    assert all(config == configs[0] for config in configs)
+    assert configs[0] is not configs[1]
+
+
+@pytest.mark.parametrize("http2", [False, True], ids=["http1", "http2"])
+def test_concurrent_get_configs(benchmark, make_stub, http2):
+    """Fetching many configs from 64 threads, over HTTP/1.1 or multiplexed HTTP/2"""
+    transport = None
+    if http2:
+        pytest.importorskip("h2")
+        transport = HTTP2Adapter(prior_knowledge=True)
+
+    stub = make_stub(configs=200, latency=0.005, http2=http2)
+
+    with ConnmanClient(
+        CIS2Environments.dev, base_url=stub.url, transport=transport
+    ) as client:
+        client.auth(stub.secret, use_token=True)
+        config_ids = client.list_configs(stub.team_id)
+
+        def fetch_all():
+            with ThreadPoolExecutor(max_workers=64) as executor:
+                return list(
+                    executor.map(
+                        lambda config_id: client.get_config(stub.team_id, config_id),
+                        config_ids,
+                    )
+                )
+
+        configs = benchmark.pedantic(fetch_all, rounds=3, iterations=1)
+
+    benchmark.extra_info["connections"] = stub.connection_count
+    assert len(configs) == 200
+    if http2:
+        assert stub.connection_count == 1
+
+
+def test_silent_logging(benchmark, capsys):
+    """Log calls in a bulk loop cost next to nothing when silent"""
+
+    def log_many():
+        for index in range(1000):
+            log.info(f"Sending request to endpoint=[bold]{index}[/bold]")
+            log.print_json({"index": index})
+
+    benchmark(log_many)
+
+    assert capsys.readouterr() == ("", "")
@@ -0,0 +1,197 @@
+"""
+Tests for cache maintenance
+"""
+# pylint: disable=redefined-outer-name
+import json
+import os
+from pathlib import Path
+from time import time
+
+import pytest
+
+from connman_cli.lib.cache import (
+    CacheEntry,
+    CacheLimits,
+    cache_stats,
+    scan_cache,
+    select_prunable,
+)
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.token import cache_token, decode_claims, get_cached_token
+from tests.stub_server import make_token
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture
+def write_entry(app_paths):
+    """Write a file of a given size and age to the cache"""
+
+    def write(name: str, size: int = 10, age: float = 0.0) -> Path:
+        app_paths.cache_dir.mkdir(exist_ok=True)
+        path = app_paths.cache_dir / name
+        path.write_bytes(b"x" * size)
+        modified = time() - age
+        os.utime(path, (modified, modified))
+        return path
+
+    return write
+
+
+def entry(name: str, size: int = 1024, age: float = 0.0, now: float = 0.0):
+    """A cache entry which has not been read from disk"""
+    kind, _, rest = name.partition("-")
+    expires = int(rest.rsplit("-", 1)[-1]) if kind == "token" else None
+    return CacheEntry(Path(name), kind, size, now - age, expires)
+
+
+def test_select_prunable_age():
+    """Expired tokens and entries over the age cap are selected"""
+    now = 100 * DAY
+    entries = [
+        entry("jwks-dev", age=1 * DAY, now=now),
+        entry("jwks-int", age=31 * DAY, now=now),
+        entry(f"token-dev-subject-{int(now) - 1}", now=now),
+        entry(f"token-dev-subject-{int(now) + 60}", now=now),
+    ]
+
+    prunable = select_prunable(entries, CacheLimits(max_age_days=30), now)
+
+    assert [item.path.name for item in prunable] == [
+        "jwks-int",
+        f"token-dev-subject-{int(now) - 1}",
+    ]
+
+
+def test_select_prunable_size():
+    """The oldest entries are selected until the cache is within the size cap"""
+    now = 100 * DAY
+    entries = [
+        entry("config-ids-dev-b", age=2 * DAY, now=now),
+        entry("config-ids-dev-a", age=3 * DAY, now=now),
+        entry("config-ids-dev-c", age=1 * DAY, now=now),
+    ]
+
+    prunable = select_prunable(entries, CacheLimits(max_size_kb=1.5), now)
+
+    assert [item.path.name for item in prunable] == [
+        "config-ids-dev-a",
+        "config-ids-dev-b",
+    ]
+    assert not select_prunable(entries, CacheLimits(max_size_kb=3), now)
+
+
+def test_select_prunable_keeps_live_tokens():
+    """Unexpired tokens are never removed for the size or age caps"""
+    now = 100 * DAY
+    token = f"token-dev-subject-{int(now) + 60}"
+    entries = [
+        entry(token, age=40 * DAY, now=now),
+        entry("jwks-dev", age=1 * DAY, now=now),
+        entry("config-ids-dev-a", age=2 * DAY, now=now),
+    ]
+
+    prunable = select_prunable(entries, CacheLimits(max_size_kb=1), now)
+    assert [item.path.name for item in prunable] == ["config-ids-dev-a", "jwks-dev"]
+
+    prunable = select_prunable(entries, CacheLimits(max_age_days=0, max_size_kb=0), now)
+    assert token not in [item.path.name for item in prunable]
+
+
+def test_cache_token_survives_size_cap(app_paths):
+    """A token is still cached after pruning with a size cap it exceeds"""
+    app_paths.config_file.write_text("[connman.cache]\nmax_size_kb = 0.1\n")
+    claims = decode_claims(make_token(["stub-team"]))
+
+    cache_token("token", claims, CIS2Environments.dev)
+
+    cached = get_cached_token(CIS2Environments.dev, claims["sub"], silent=True)
+    assert cached["token"] == "token"
+
+
+def test_limits_from_config(app_paths):
+    """The [connman.cache] section overrides the default caps"""
+    assert CacheLimits.from_config() == CacheLimits()
+
+    app_paths.config_file.write_text(
+        "[connman.cache]\nmax_age_days = 7\nmax_size_kb = 256\n"
+    )
+
+    assert CacheLimits.from_config() == CacheLimits(max_age_days=7, max_size_kb=256)
+
+
+def test_cache_stats(write_entry):
+    """Entries are counted by kind and by age"""
+    write_entry("jwks-dev.json", size=20)
+    write_entry("config-ids-dev-team.json", size=30, age=2 * 60 * 60)
+    write_entry("token-dev-subject-1.json", age=8 * DAY)
+    write_entry("other.json", age=40 * DAY)
+
+    stats = cache_stats()
+
+    assert stats["entries"] == 4
+    assert stats["bytes"] == 70
+    assert stats["expired_tokens"] == 1
+    assert stats["kinds"]["config-ids"] == {"entries": 1, "bytes": 30}
+    assert stats["age_histogram"] == {
+        "<1h": 1,
+        "<1d": 1,
+        "<7d": 0,
+        "<30d": 1,
+        ">=30d": 1,
+    }
+
+
+def test_cache_stats_command(cli, write_entry):
+    """cache stats prints the stats as JSON"""
+    write_entry("jwks-dev.json")
+
+    result = cli("cache", "stats")
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["kinds"] == {"jwks": {"entries": 1, "bytes": 10}}
+
+
+def test_prune_command(cli, write_entry):
+    """cache prune removes entries over the caps given as options"""
+    write_entry("jwks-dev.json", age=1 * DAY)
+    write_entry("jwks-int.json", age=3 * DAY)
+
+    result = cli("cache", "prune", "--max-age-days", "2")
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["files"] == ["jwks-int.json"]
+    assert [item.path.name for item in scan_cache()] == ["jwks-dev.json"]
+
+
+def test_prune_dry_run(cli, write_entry):
+    """cache prune --dry-run lists the entries without removing them"""
+    write_entry("jwks-dev.json", size=2048)
+    write_entry("jwks-int.json", size=2048, age=60)
+
+    result = cli("cache", "prune", "--max-size-kb", "2", "--dry-run")
+
+    assert result.exit_code == 0
+    assert json.loads(result.stdout) == {
+        "entries": 1,
+        "bytes": 2048,
+        "files": ["jwks-int.json"],
+    }
+    assert len(scan_cache()) == 2
+
+
+def test_clear_command(cli, write_entry):
+    """cache clear asks for confirmation unless --yes is given"""
+    write_entry("jwks-dev.json")
+    write_entry("token-dev-subject-1.json")
+
+    aborted = cli("cache", "clear")
+
+    assert aborted.exit_code == 1
+    assert len(scan_cache()) == 2
+
+    cleared = cli("cache", "clear", "--yes")
+
+    assert cleared.exit_code == 0
+    assert json.loads(cleared.stdout)["entries"] == 2
+    assert not scan_cache()
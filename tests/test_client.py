@@ -0,0 +1,99 @@
+"""
+Tests for the embeddable client against the local stub server
+"""
+from time import time
+
+import pytest
+
+from connman_cli.lib import token as token_module
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import (
+    APIError,
+    MissingArgumentsError,
+    TokenNotFoundError,
+    TransportError,
+)
+from connman_cli.lib.token import (
+    CachedTokenProvider,
+    StaticTokenProvider,
+    cache_token,
+    decode_claims,
+)
+from tests.stub_server import make_token
+
+
+def make_client(stub, **kwargs) -> ConnmanClient:
+    """Client for the stub server"""
+    return ConnmanClient(CIS2Environments.dev, base_url=stub.url, **kwargs)
+
+
+def test_api_error(stub, authenticate):
+    """Unsuccessful responses raise APIError with their status code"""
+    authenticate()
+
+    with make_client(stub) as client:
+        with pytest.raises(APIError) as error:
+            client.get_config(stub.team_id, "missing")
+
+    assert error.value.status_code == 404
+    assert error.value.endpoint == f"/api/configs/{stub.team_id}/missing"
+
+
+def test_token_not_found(stub):
+    """Without a cached token, team endpoints raise TokenNotFoundError"""
+    with make_client(stub) as client:
+        with pytest.raises(TokenNotFoundError, match=stub.team_id):
+            client.list_configs(stub.team_id)
+
+    assert stub.request_count == 0
+
+
+def test_missing_team_id(stub):
+    """An empty team ID raises MissingArgumentsError before any request"""
+    with make_client(stub, token_provider=StaticTokenProvider("token")) as client:
+        with pytest.raises(MissingArgumentsError):
+            client.list_configs("")
+
+    assert stub.request_count == 0
+
+
+def test_transport_error(stub):
+    """Requests to a server that is not running raise TransportError"""
+    stub.stop()
+
+    with make_client(stub) as client:
+        with pytest.raises(TransportError) as error:
+            client.ping()
+
+    assert error.value.endpoint == "/api/hello_world"
+
+
+@pytest.mark.parametrize("stub", [1], indirect=True)
+def test_auth_use_token(stub):
+    """With use_token the token from auth is used rather than the cache"""
+    with make_client(stub) as client:
+        result = client.auth(stub.secret, use_token=True)
+
+        assert isinstance(client.token_provider, StaticTokenProvider)
+        assert client.token_provider.token == result.token
+        assert client.list_configs(stub.team_id) == ["config-00000"]
+
+    assert result.team_ids == [stub.team_id]
+
+
+def test_cached_token_provider_rereads_expired_token(stub, monkeypatch):
+    """Tokens are held in memory until they expire, then read from the cache"""
+    first = make_token([stub.team_id], lifetime=100)
+    second = make_token([stub.team_id], lifetime=3600)
+    provider = CachedTokenProvider()
+
+    cache_token(first, decode_claims(first), CIS2Environments.dev)
+    assert provider.get_token(CIS2Environments.dev, stub.team_id) == first
+
+    cache_token(second, decode_claims(second), CIS2Environments.dev)
+    assert provider.get_token(CIS2Environments.dev, stub.team_id) == first
+
+    later = time() + 200
+    monkeypatch.setattr(token_module, "time", lambda: later)
+    assert provider.get_token(CIS2Environments.dev, stub.team_id) == second
@@ -0,0 +1,87 @@
+"""
+Tests for shell completion
+"""
+import json
+
+import pytest
+
+from connman_cli.app import app
+from connman_cli.lib.completion import fast_complete
+
+COMMAND_LINES = [
+    "connman config get --env dev --team-id stub-team config",
+    "connman config get ",
+    "connman config edit --env=int --team-id other-team ",
+    "connman auth login --env dev --profile ",
+    "connman profile get a",
+]
+
+
+@pytest.fixture(autouse=True)
+def completion_files(app_paths):
+    """Two profiles, and cached config IDs for two teams"""
+    app_paths.config_file.write_text(
+        "[connman.profile.alpha]\nenvironment = dev\n"
+        "[connman.profile.beta]\nenvironment = int\n"
+    )
+    app_paths.cache_dir.mkdir()
+    (app_paths.cache_dir / "config-ids-dev-stub-team.json").write_text(
+        json.dumps(["config-00000", "config-00001", "other"])
+    )
+    (app_paths.cache_dir / "config-ids-int-other-team.json").write_text(
+        json.dumps(["int-config"])
+    )
+
+
+def complete_bash(monkeypatch, capsys, words: str, fast: bool) -> str:
+    """Complete a command line as bash would, with or without the fast path"""
+    cword = len(words.split()) - (0 if words.endswith(" ") else 1)
+    monkeypatch.setenv("_CONNMAN_COMPLETE", "complete_bash")
+    monkeypatch.setenv("COMP_WORDS", words)
+    monkeypatch.setenv("COMP_CWORD", str(cword))
+
+    if fast:
+        assert fast_complete("complete_bash")
+    else:
+        with pytest.raises(SystemExit):
+            app(prog_name="connman")
+
+    return capsys.readouterr().out
+
+
+@pytest.mark.parametrize("words", COMMAND_LINES)
+def test_fast_completion_matches_typer(monkeypatch, capsys, words):
+    """The fast path completes exactly as typer does"""
+    fast = complete_bash(monkeypatch, capsys, words, fast=True)
+
+    assert fast.strip()
+    assert fast == complete_bash(monkeypatch, capsys, words, fast=False)
+
+
+@pytest.mark.parametrize(
+    "words",
+    [
+        "connman config get --env ",
+        "connman config get config-00000 ",
+        "connman config get --",
+        "connman --quiet profile get ",
+        "connman ping --env ",
+    ],
+)
+def test_fast_completion_leaves_the_rest_to_typer(monkeypatch, capsys, words):
+    """Anything but a profile name or config ID is not answered, nor written"""
+    cword = len(words.split()) - (0 if words.endswith(" ") else 1)
+    monkeypatch.setenv("COMP_WORDS", words)
+    monkeypatch.setenv("COMP_CWORD", str(cword))
+
+    assert not fast_complete("complete_bash")
+    assert not fast_complete("source_bash")
+    assert capsys.readouterr().out == ""
+
+
+def test_fast_completion_zsh(monkeypatch, capsys):
+    """zsh completions use typer's _arguments format"""
+    monkeypatch.setenv("_TYPER_COMPLETE_ARGS", "connman profile get ")
+
+    assert fast_complete("complete_zsh")
+    assert capsys.readouterr().out == '_arguments \'*: :(("alpha"\n"beta"))\'\n'
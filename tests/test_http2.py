@@ -0,0 +1,142 @@
+"""
+Tests for the HTTP/2 transport
+"""
+# pylint: disable=redefined-outer-name
+import datetime
+import ipaddress
+import json
+import ssl
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import TransportError
+
+pytest.importorskip("h2")
+
+# pylint: disable=wrong-import-position
+from connman_cli.lib.http2 import HTTP2Adapter
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory):
+    """Self-signed certificate and key files for 127.0.0.1"""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+
+    directory = tmp_path_factory.mktemp("tls")
+    cert_file = directory / "cert.pem"
+    key_file = directory / "key.pem"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+
+    return str(cert_file), str(key_file)
+
+
+@pytest.fixture(autouse=True)
+def no_ca_bundle(monkeypatch):
+    """
+    Unset the CA bundle variables, which requests prefers over session.verify
+    """
+    monkeypatch.delenv("REQUESTS_CA_BUNDLE", raising=False)
+    monkeypatch.delenv("CURL_CA_BUNDLE", raising=False)
+
+
+@pytest.fixture
+def tls_stub(make_stub, certificate):
+    """Stub server over TLS with the self-signed certificate"""
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(*certificate)
+    return make_stub(ssl_context=context)
+
+
+def test_ca_bundle(tls_stub, certificate, monkeypatch):
+    """REQUESTS_CA_BUNDLE is used to verify the server certificate"""
+    with ConnmanClient(
+        CIS2Environments.dev, base_url=tls_stub.url, transport=HTTP2Adapter()
+    ) as client:
+        with pytest.raises(TransportError) as error:
+            client.ping()
+
+        assert "CERTIFICATE_VERIFY_FAILED" in str(error.value.__cause__)
+
+        monkeypatch.setenv("REQUESTS_CA_BUNDLE", certificate[0])
+        assert client.ping() == {"message": "Hello World"}
+
+        monkeypatch.delenv("REQUESTS_CA_BUNDLE")
+        client.session.verify = False
+        assert client.ping() == {"message": "Hello World"}
+
+
+def test_client_certificate(tls_stub, certificate):
+    """A session client certificate is loaded into the TLS context"""
+    transport = HTTP2Adapter()
+
+    with ConnmanClient(
+        CIS2Environments.dev, base_url=tls_stub.url, transport=transport
+    ) as client:
+        client.session.verify = certificate[0]
+        client.session.cert = certificate
+        assert client.ping() == {"message": "Hello World"}
+
+        client.session.cert = ("missing.pem", "missing.key")
+        with pytest.raises(TransportError):
+            client.ping()
+
+    assert (certificate[0], certificate, None) in transport.clients
+
+
+def test_proxy(make_stub):
+    """Requests are sent through the proxy selected by the session"""
+    proxy = make_stub()
+    origin = make_stub()
+    origin.stop()
+
+    with ConnmanClient(
+        CIS2Environments.dev, base_url=origin.url, transport=HTTP2Adapter()
+    ) as client:
+        client.session.proxies = {"http": proxy.url}
+        assert client.ping() == {"message": "Hello World"}
+
+    assert proxy.request_count == 1
+
+
+@pytest.mark.parametrize("stub", [10], indirect=True)
+def test_config_list_http2_fallback(cli, stub, authenticate):
+    """--http2 falls back to HTTP/1.1 when the server does not negotiate HTTP/2"""
+    authenticate()
+    args = ["config", "list", "--with-detail", "--env", "dev"]
+
+    result = cli("--http2", *args, "--team-id", stub.team_id)
+
+    assert result.exit_code == 0
+    assert len(json.loads(result.stdout)) == 10
@@ -0,0 +1,26 @@
+"""
+Tests for the ping command
+"""
+import json
+
+from connman_cli.lib.constants import CIS2Environments
+
+
+def test_ping_all(cli, env_stubs):
+    """Every environment is checked, and saved profiles are authenticated"""
+    result = cli("ping", "--all", "--auth")
+
+    assert result.exit_code == 1
+    report = {(item["env"], item["check"]): item for item in json.loads(result.stdout)}
+    assert set(report) == {
+        ("dev", "ping"),
+        ("dev", "auth:stub"),
+        ("int", "ping"),
+        ("dep", "ping"),
+    }
+    assert report[("dev", "ping")]["reused_connection"] is False
+    assert report[("dev", "auth:stub")]["status_code"] == 200
+    assert report[("dev", "auth:stub")]["reused_connection"] is True
+    assert report[("int", "ping")]["ok"] is True
+    assert report[("dep", "ping")]["ok"] is False
+    assert env_stubs[CIS2Environments.int].request_count == 1
@@ -0,0 +1,79 @@
+"""
+Tests for --profile-run
+"""
+import json
+import pstats
+
+import pytest
+
+
+def check_speedscope(data: dict):
+    """
+    Check a file against the speedscope file format for evented profiles
+
+    https://www.speedscope.app/file-format-schema.json
+    """
+    assert data["$schema"] == "https://www.speedscope.app/file-format-schema.json"
+    frames = data["shared"]["frames"]
+    assert frames
+    for frame in frames:
+        assert isinstance(frame["name"], str)
+        assert isinstance(frame.get("file", ""), str)
+        assert isinstance(frame.get("line", 0), int)
+
+    (profile,) = data["profiles"]
+    assert profile["type"] == "evented"
+    assert profile["unit"] == "seconds"
+    assert isinstance(profile["name"], str)
+    assert 0 == profile["startValue"] <= profile["endValue"]
+
+    # Frames are closed in the reverse order they were opened
+    stack = []
+    last = profile["startValue"]
+    for event in profile["events"]:
+        assert 0 <= event["frame"] < len(frames)
+        assert last <= event["at"] <= profile["endValue"]
+        last = event["at"]
+
+        if event["type"] == "O":
+            stack.append(event["frame"])
+        else:
+            assert event["type"] == "C"
+            assert stack.pop() == event["frame"]
+
+    assert not stack
+
+
+@pytest.mark.parametrize("memory", [False, True], ids=["time", "memory"])
+def test_profile_pstats(cli, stub, tmp_path, memory):
+    """The pstats profile can be loaded and includes the command"""
+    output = tmp_path / "ping.prof"
+    args = ["--profile-run", str(output)]
+    if memory:
+        args.append("--profile-memory")
+
+    result = cli(*args, "ping", "--env", "dev")
+
+    assert result.exit_code == 0
+    assert stub.request_count == 1
+    functions = {func[2] for func in pstats.Stats(str(output)).stats}
+    assert "ping" in functions
+    assert "Hot Spots" in result.stderr
+    assert ("Allocations" in result.stderr) is memory
+    assert "profiling.py" not in result.stderr.partition("Allocations")[2]
+
+
+def test_profile_speedscope(cli, stub, tmp_path):
+    """The speedscope profile is a valid evented profile of the command"""
+    output = tmp_path / "ping.json"
+
+    result = cli(
+        *("--profile-run", str(output), "--profile-format", "speedscope"),
+        *("ping", "--env", "dev"),
+    )
+
+    assert result.exit_code == 0
+    assert stub.request_count == 1
+    data = json.loads(output.read_text())
+    check_speedscope(data)
+    assert "ping" in {frame["name"] for frame in data["shared"]["frames"]}
@@ -0,0 +1,77 @@
+"""
+Tests for request coalescing
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep
+
+import pytest
+
+from connman_cli.lib.singleflight import SingleFlight
+
+CALLERS = 8
+
+
+def coalesce(single_flight: SingleFlight, function):
+    """Call function from several threads at once, once they have all joined"""
+    calls = []
+
+    def call():
+        calls.append(threading.current_thread())
+        # Hold the call open until every other caller is waiting on it
+        while single_flight.shared < CALLERS - 1:
+            sleep(0.001)
+
+        return function()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [
+            executor.submit(single_flight.do, "key", call) for _ in range(CALLERS)
+        ]
+
+    return calls, futures
+
+
+def test_every_caller_gets_a_copy():
+    """Callers that joined the call each get a copy of its result"""
+    single_flight = SingleFlight()
+    original = {"configs": ["config-00000"]}
+
+    calls, futures = coalesce(single_flight, lambda: original)
+    results = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(result == original for result in results)
+    assert sum(result is original for result in results) == 1
+    assert len({id(result) for result in [original, *results]}) == CALLERS
+
+    original["configs"].append("changed")
+    copies = [result for result in results if result is not original]
+    copies[0]["configs"].append("also changed")
+    assert copies[1] == {"configs": ["config-00000"]}
+
+
+def test_uncontended_call_is_not_copied():
+    """A call nobody joined returns the result itself"""
+    single_flight = SingleFlight()
+    original = {"configs": ["config-00000"]}
+
+    assert single_flight.do("key", lambda: original) is original
+    assert single_flight.shared == 0
+
+
+def test_errors_are_shared():
+    """Every waiting caller receives the exception of the call"""
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("failed")
+
+    calls, futures = coalesce(single_flight, fail)
+
+    assert len(calls) == 1
+    for future in futures:
+        with pytest.raises(ValueError, match="failed"):
+            future.result()
+
+    assert single_flight.do("key", lambda: "again") == "again"
@@ -0,0 +1,167 @@
+"""
+Tests for access token decoding and verification
+"""
+# pylint: disable=redefined-outer-name
+import base64
+from time import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import InvalidTokenError
+from connman_cli.lib.token import (
+    decode_claims,
+    get_jwks,
+    get_jwks_uri,
+    verify_token,
+)
+from tests.stub_server import make_token
+
+
+@pytest.fixture(scope="module")
+def signing_keys():
+    """Two RSA signing keys, generated once as they are slow to create"""
+    return [
+        rsa.generate_private_key(public_exponent=65537, key_size=2048) for _ in range(2)
+    ]
+
+
+def public_jwk(private_key, kid: str) -> dict:
+    """Public JWK of an RSA key"""
+    jwk = jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    return {**jwk, "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+def sign(private_key, kid: str, **claims) -> str:
+    """Sign a token with Connection Manager claims"""
+    now = int(time())
+    payload = {
+        "sub": "stub-team",
+        "aud": "connman",
+        "iat": now,
+        "exp": now + 3600,
+        "team_ids": ["stub-team"],
+        **claims,
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": kid})
+
+
+def test_decode_claims():
+    """Claims are decoded without a signature check"""
+    claims = decode_claims(make_token(["team-a", "team-b"]))
+
+    assert claims["sub"] == "team-a"
+    assert claims["team_ids"] == ["team-a", "team-b"]
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "not-a-token",
+        "a.b.c.d",
+        "header.!!!.",
+        f"header.{base64.urlsafe_b64encode(b'[1, 2]').decode()}.",
+    ],
+    ids=["one-segment", "four-segments", "bad-base64", "not-an-object"],
+)
+def test_decode_claims_invalid(token):
+    """Tokens that cannot be decoded raise InvalidTokenError"""
+    with pytest.raises(InvalidTokenError):
+        decode_claims(token)
+
+
+def test_get_jwks_ttl(stub, signing_keys):
+    """Key sets are cached on disk until their TTL expires, or a refresh"""
+    stub.jwks = {"keys": [public_jwk(signing_keys[0], "one")]}
+    jwks_url = f"{stub.url}/oauth2/jwks"
+
+    assert get_jwks(jwks_url) == stub.jwks
+    assert get_jwks(jwks_url) == stub.jwks
+    assert stub.request_count == 1
+
+    stub.jwks = {"keys": [public_jwk(signing_keys[1], "two")]}
+    assert get_jwks(jwks_url, ttl=0) == stub.jwks
+    assert get_jwks(jwks_url, refresh=True) == stub.jwks
+    assert stub.request_count == 3
+
+
+def test_get_jwks_uri(stub):
+    """The JWKS URI is read from the issuer's cached discovery document"""
+    assert get_jwks_uri(f"{stub.url}/") == f"{stub.url}/oauth2/jwks"
+    assert get_jwks_uri(stub.url) == f"{stub.url}/oauth2/jwks"
+    assert stub.request_count == 1
+
+    with pytest.raises(InvalidTokenError, match="Could not fetch issuer metadata"):
+        get_jwks_uri(f"{stub.url}/missing")
+
+
+def test_get_jwks_uri_other_issuer(stub):
+    """Discovery documents for a different issuer are rejected"""
+    with pytest.raises(InvalidTokenError, match="is not for"):
+        get_jwks_uri(stub.url.replace("127.0.0.1", "localhost"))
+
+
+def test_verify_token(stub, signing_keys):
+    """A token signed by the pinned issuer is verified and its claims returned"""
+    stub.jwks = {"keys": [public_jwk(signing_keys[0], "one")]}
+    token = sign(signing_keys[0], "one", iss=stub.url)
+
+    claims = verify_token(token, stub.url)
+
+    assert claims["iss"] == stub.url
+    assert claims["team_ids"] == ["stub-team"]
+    assert verify_token(token, f"{stub.url}/") == claims
+    assert stub.request_count == 2
+
+
+def test_verify_token_refreshes_on_unknown_kid(stub, signing_keys):
+    """Rotated keys are fetched once, unknown keys after a single refresh"""
+    stub.jwks = {"keys": [public_jwk(signing_keys[0], "one")]}
+    verify_token(sign(signing_keys[0], "one", iss=stub.url), stub.url)
+
+    stub.jwks = {"keys": [public_jwk(signing_keys[1], "two")]}
+    verify_token(sign(signing_keys[1], "two", iss=stub.url), stub.url)
+    assert stub.request_count == 3
+
+    with pytest.raises(InvalidTokenError, match="No signing key found for kid=three"):
+        verify_token(sign(signing_keys[1], "three", iss=stub.url), stub.url)
+    assert stub.request_count == 4
+
+
+@pytest.mark.parametrize(
+    "claims,message",
+    [
+        ({}, "Access token has no issuer"),
+        ({"iss": "https://attacker.example"}, "does not match"),
+    ],
+    ids=["missing", "mismatch"],
+)
+def test_verify_token_issuer(stub, signing_keys, claims, message):
+    """Tokens from any other issuer are rejected before keys are fetched"""
+    stub.jwks = {"keys": [public_jwk(signing_keys[0], "one")]}
+
+    with pytest.raises(InvalidTokenError, match=message):
+        verify_token(sign(signing_keys[0], "one", **claims), stub.url)
+
+    assert stub.request_count == 0
+
+
+def test_verify_token_bad_signature(stub, signing_keys):
+    """Tokens signed with a different key than the published one are rejected"""
+    stub.jwks = {"keys": [public_jwk(signing_keys[0], "one")]}
+    token = sign(signing_keys[1], "one", iss=stub.url)
+
+    with pytest.raises(InvalidTokenError, match="Signature verification failed"):
+        verify_token(token, stub.url)
+
+
+def test_auth_verify_rejects_unsigned_token(stub):
+    """auth with verify does not accept the stub's unsigned tokens"""
+    with ConnmanClient(CIS2Environments.dev, base_url=stub.url) as client:
+        with pytest.raises(InvalidTokenError, match="Unsupported token algorithm"):
+            client.auth(stub.secret, verify=True)
+
+        assert client.auth(stub.secret).info["iss"] == "stub-connection-manager"
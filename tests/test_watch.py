@@ -0,0 +1,113 @@
+"""
+Tests for config watching
+"""
+import json
+
+import pytest
+
+from connman_cli.lib.client import ConnmanClient
+from connman_cli.lib.constants import CIS2Environments
+from connman_cli.lib.exceptions import APIError
+from connman_cli.lib.watch import MIN_INTERVAL, AdaptiveInterval, ConfigWatcher
+
+
+def test_adaptive_interval():
+    """The interval backs off to the maximum and resets on a change"""
+    interval = AdaptiveInterval(5.0, 15.0)
+
+    interval.unchanged()
+    assert interval.current == 10.0
+    interval.unchanged()
+    assert interval.current == 15.0
+
+    interval.changed()
+    assert interval.current == 5.0
+
+
+@pytest.mark.parametrize("minimum", [0.0, -1.0, 0.01])
+def test_adaptive_interval_floor(minimum):
+    """Short or zero intervals are raised so that a watch never busy-polls"""
+    interval = AdaptiveInterval(minimum, 0.0)
+
+    assert interval.current == interval.minimum == interval.maximum == MIN_INTERVAL
+
+
+@pytest.mark.parametrize("option", ["--interval", "--max-interval"])
+def test_watch_rejects_short_interval(cli, stub, option):
+    """Intervals below one second are rejected before any request is sent"""
+    result = cli(
+        *("config", "watch", "--env", "dev", "--team-id", stub.team_id),
+        *(option, "0"),
+    )
+
+    assert result.exit_code == 2
+    assert "Invalid value" in result.stderr
+    assert stub.request_count == 0
+
+
+@pytest.mark.parametrize("stub", [2], indirect=True)
+def test_config_watch_command(cli, stub, authenticate):
+    """Existing configs are printed as JSON lines with --initial"""
+    authenticate()
+
+    result = cli(
+        *("config", "watch", "--env", "dev", "--team-id", stub.team_id),
+        *("--initial", "--max-polls", "1"),
+    )
+
+    assert result.exit_code == 0
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [event["config_id"] for event in events] == ["config-00000", "config-00001"]
+    assert {event["event"] for event in events} == {"created"}
+
+
+@pytest.mark.parametrize("stub", [2], indirect=True)
+def test_config_watch_logs_to_stderr(cli, stub, authenticate, monkeypatch):
+    """With logging on, stdout only holds events and log messages go to stderr"""
+    monkeypatch.setenv("CONNMAN_SILENT", "False")
+    authenticate()
+
+    result = cli(
+        *("config", "watch", "--env", "dev", "--team-id", stub.team_id),
+        *("--initial", "--max-polls", "1"),
+    )
+
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert len(lines) == 2
+    assert all(json.loads(line)["event"] == "created" for line in lines)
+    assert "Sending request to endpoint=" in result.stderr
+
+
+@pytest.mark.parametrize("stub", [2], indirect=True)
+def test_failed_poll_keeps_changes(stub, authenticate):
+    """A change seen by a poll that then fails is reported by the next poll"""
+    authenticate()
+    with ConnmanClient(CIS2Environments.dev, base_url=stub.url) as client:
+        watcher = ConfigWatcher(client, stub.team_id)
+        watcher.poll()
+
+        stub.teams[stub.team_id]["config-00000"] = stub.make_entry(
+            {"client_name": "changed"}
+        )
+        stub.fail(f"/api/configs/{stub.team_id}/config-00001")
+        with pytest.raises(APIError):
+            watcher.poll()
+
+        events = watcher.poll()
+
+    assert [(event.event.value, event.config_id) for event in events] == [
+        ("updated", "config-00000")
+    ]
+
+
+def test_config_watch_replay_missing_cassette(cli, stub, tmp_path):
+    """A missing cassette is logged as an error rather than a traceback"""
+    result = cli(
+        *("--replay", str(tmp_path / "missing.json")),
+        *("config", "watch", "--env", "dev", "--team-id", stub.team_id),
+        *("--max-polls", "1"),
+    )
+
+    assert result.exit_code == 1
+    assert stub.request_count == 0